@@ -0,0 +1,61 @@
+"""Helpers shared by the benchmarks and the detector scripts: image corpora, latency summaries and run metadata."""
+import os
+import statistics
+import subprocess
+from io import BytesIO
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def image_files(path, limit=None):
+    """Sorted image paths in a directory, at most limit of them."""
+    files = sorted(
+        os.path.join(path, name) for name in os.listdir(path)
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )[:limit]
+    if not files:
+        raise SystemExit(f"No images found in {path}")
+    return files
+
+
+def load_corpus(path, limit=None):
+    """Encoded bytes of the images in a directory."""
+    corpus = []
+    for file_path in image_files(path, limit):
+        with open(file_path, "rb") as f:
+            corpus.append(f.read())
+    return corpus
+
+
+def synthetic_corpus(count, height, width):
+    """Random-noise JPEGs of the given size; they time decode and inference but contain no documents."""
+    from PIL import Image
+    import numpy as np
+
+    corpus = []
+    for seed in range(count):
+        pixels = np.random.default_rng(seed).integers(0, 255, (height, width, 3), dtype=np.uint8)
+        stream = BytesIO()
+        Image.fromarray(pixels).save(stream, format="JPEG", quality=90)
+        corpus.append(stream.getvalue())
+    return corpus
+
+
+def timings(samples):
+    """Mean, p50, p95 and min in milliseconds of latency samples given in seconds."""
+    ordered = sorted(samples)
+    return {
+        "mean_ms": 1000 * statistics.fmean(ordered),
+        "p50_ms": 1000 * ordered[len(ordered) // 2],
+        "p95_ms": 1000 * ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+        "min_ms": 1000 * ordered[0],
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return None
@@ -0,0 +1,200 @@
+"""Local stand-ins for MinIO, the aiomysql pool, the face backend and the detector, used by the load test."""
+import os
+import time
+import asyncio
+import threading
+import numpy as np
+from types import SimpleNamespace
+from utilities.face_backends import FaceCompareBackend
+
+
+class FakeObject:
+    def __init__(self, data: bytes):
+        self._data = data
+
+    def read(self):
+        return self._data
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+class FakeMinio:
+    """In-memory replacement for the minio.Minio methods used by utilities.storage."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.objects = {}
+        self._lock = threading.Lock()
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def bucket_exists(self, bucket_name):
+        return True
+
+    def make_bucket(self, bucket_name):
+        pass
+
+    def put_object(self, bucket_name, object_name, data, length, content_type=None, **kwargs):
+        self._wait()
+        with self._lock:
+            self.objects[object_name] = data.read(length) if length >= 0 else data.read()
+
+    def fput_object(self, bucket_name, object_name, file_path, content_type=None, **kwargs):
+        self._wait()
+        with open(file_path, "rb") as f:
+            data = f.read()
+        with self._lock:
+            self.objects[object_name] = data
+
+    def _lookup(self, object_name):
+        with self._lock:
+            if object_name not in self.objects:
+                raise KeyError(f"NoSuchKey: {object_name}")
+            return self.objects[object_name]
+
+    def get_object(self, bucket_name, object_name, **kwargs):
+        self._wait()
+        return FakeObject(self._lookup(object_name))
+
+    def fget_object(self, bucket_name, object_name, file_path, **kwargs):
+        self._wait()
+        data = self._lookup(object_name)
+        with open(file_path, "wb") as f:
+            f.write(data)
+
+
+class FakeCursor:
+    """Answers the stored procedures the routers call with the row shapes MySQL returns."""
+
+    def __init__(self, db):
+        self._db = db
+        self._rows = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        pass
+
+    async def _respond(self, procname, args):
+        if self._db.latency:
+            await asyncio.sleep(self._db.latency)
+        if procname == "SP_INSERT_DD":
+            msisdn, document_photo_path, is_back = args[0], args[5], args[9]
+            if not is_back:
+                self._db.front_paths[msisdn] = document_photo_path
+            # Back uploads complete the document scan, which triggers face compare
+            self._rows = [("ok", bytes([1 if is_back else 0]), 0)]
+        elif procname == "SP_FETCH_PHOTO_URL":
+            msisdn = args[0]
+            self._rows = [(self._db.liveness_paths.get(msisdn), self._db.front_paths.get(msisdn))]
+        elif procname == "SP_INSERT_FACECOMPARE":
+            self._rows = [("ok", bytes([1]), 0)]
+        elif procname == "SP_INSERT_LIVENESS":
+            self._db.liveness_paths[args[0]] = args[4]
+            self._rows = [("ok", bytes([1]), 0)]
+        else:
+            self._rows = []
+
+    async def callproc(self, procname, args=()):
+        await self._respond(procname, args)
+
+    async def execute(self, query, args=None):
+        if query.startswith("CALL "):
+            await self._respond(query[5:].split("(", 1)[0].strip(), args or ())
+        else:
+            self._rows = []
+
+    async def executemany(self, query, args):
+        self._rows = []
+
+    async def fetchall(self):
+        return self._rows
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self._db = db
+
+    def cursor(self):
+        return FakeCursor(self._db)
+
+    async def commit(self):
+        pass
+
+
+class FakePool:
+    """Mimics the parts of aiomysql.Pool that dbconfig.InstrumentedPool relies on."""
+
+    def __init__(self, maxsize: int = 10, latency: float = 0.0):
+        self.minsize = maxsize
+        self.maxsize = maxsize
+        self.latency = latency
+        self.front_paths = {}
+        self.liveness_paths = {}
+        self._free = asyncio.Semaphore(maxsize)
+        self._in_use = 0
+
+    @property
+    def size(self):
+        return self.maxsize
+
+    @property
+    def freesize(self):
+        return self.maxsize - self._in_use
+
+    async def acquire(self):
+        await self._free.acquire()
+        self._in_use += 1
+        return FakeConnection(self)
+
+    async def release(self, conn):
+        self._in_use -= 1
+        self._free.release()
+
+    def close(self):
+        pass
+
+    async def wait_closed(self):
+        pass
+
+
+class StubFaceBackend(FaceCompareBackend):
+    """Face backend returning a fixed match after a simulated remote round trip."""
+
+    name = "stub"
+    latency = float(os.getenv("BENCH_FACE_LATENCY", 0.15))
+
+    async def compare(self, source_bytes, target_bytes, target_features=None):
+        await asyncio.sleep(self.latency)
+        return {
+            "source_image_bounding_box": {"Width": 0.2, "Height": 0.3, "Left": 0.1, "Top": 0.2},
+            "face_matches": [{
+                "similarity": 98.5,
+                "confidence": 99.9,
+                "bounding_box": {"width": 0.4, "height": 0.5, "left": 0.3, "top": 0.2},
+            }],
+            "unmatched_faces": [],
+        }
+
+
+class StubDetector:
+    """Callable with the YOLOv5 AutoShape interface that always finds one citizenship card."""
+
+    names = {0: "CSF", 1: "CSB"}
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+
+    def __call__(self, images):
+        time.sleep(self.latency * max(1, len(images)) ** 0.5)  # Batches amortise part of the cost
+        return SimpleNamespace(
+            xyxy=[np.array([[10.0, 10.0, 200.0, 120.0, 0.95, 0.0]]) for _ in images],
+            names=self.names,
+        )
@@ -0,0 +1,144 @@
+"""Micro-benchmark for the YOLOv5 document detector on CPU.
+
+Measures model load time, image decode cost, and forward-pass latency and
+throughput across inference sizes, batch sizes and torch thread counts.
+Exported backends (DETECTOR_BACKEND other than torch) have a fixed input size
+and take their threads from DETECTOR_THREADS, so only batch sizes are swept.
+
+    python -m benchmarks.inference_bench --corpus samples/ids --sizes 320,480,640 --batch-sizes 1,4,8 --threads 1,2,4
+
+Results are written as JSON (one row per size/batch/threads combination) so
+runs before and after an optimisation can be diffed directly.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import contextlib
+from datetime import datetime, timezone
+
+os.environ.setdefault("MODEL_WARMUP_RUNS", "0")  # Warm-up is measured separately below
+
+from utilities import model_registry, detector_backends
+from utilities.image_utils import decode_image
+from benchmarks.common import load_corpus, synthetic_corpus, timings, git_revision
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v]
+
+
+def bench_decode(corpus, repeats):
+    samples = []
+    for _ in range(repeats):
+        for image_bytes in corpus:
+            start = time.perf_counter()
+            decode_image(image_bytes)
+            samples.append(time.perf_counter() - start)
+    return timings(samples)
+
+
+def bench_forward(model, images, size, batch_size, threads, iterations, warmup):
+    if model_registry.DETECTOR_BACKEND == "torch":
+        import torch
+        torch.set_num_threads(threads)
+        no_grad = torch.inference_mode()
+    else:
+        no_grad = contextlib.nullcontext()
+
+    batches = [
+        [images[(start + i) % len(images)] for i in range(batch_size)]
+        for start in range(0, iterations * batch_size, batch_size)
+    ]
+
+    with no_grad:
+        for batch in batches[:warmup]:
+            model(batch, size=size)
+
+        samples, stage_ms = [], []
+        for batch in batches:
+            start = time.perf_counter()
+            results = model(batch, size=size)
+            samples.append(time.perf_counter() - start)
+            stage_ms.append(results.t)  # (preprocess, inference, NMS) ms per image, as reported by YOLOv5
+
+    per_batch = timings(samples)
+    return {
+        "size": size,
+        "batch_size": batch_size,
+        "threads": threads,
+        "batch_latency": per_batch,
+        "images_per_second": batch_size / statistics.fmean(samples),
+        "per_image_ms": {
+            "preprocess": statistics.fmean(t[0] for t in stage_ms),
+            "inference": statistics.fmean(t[1] for t in stage_ms),
+            "nms": statistics.fmean(t[2] for t in stage_ms),
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="Directory of sample ID images (synthetic 12 MP images if omitted)")
+    parser.add_argument("--images", type=int, default=8, help="Images taken from the corpus")
+    parser.add_argument("--sizes", type=_int_list, default=[320, 480, 640], help="Inference sizes (longest edge)")
+    parser.add_argument("--batch-sizes", type=_int_list, default=[1, 2, 4, 8])
+    parser.add_argument("--threads", type=_int_list, default=sorted({1, 2, os.cpu_count() or 1}))
+    parser.add_argument("--iterations", type=int, default=20, help="Timed batches per combination")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed batches per combination")
+    parser.add_argument("--output", default="inference_bench.json", help="Where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.corpus, args.images) if args.corpus else synthetic_corpus(args.images, 3000, 4000)  # 12 MP
+
+    start = time.perf_counter()
+    model = model_registry.get_model("document")
+    load_seconds = time.perf_counter() - start
+
+    decode = bench_decode(corpus, repeats=3)
+    images = [decode_image(image_bytes)[0] for image_bytes in corpus]
+
+    if model_registry.DETECTOR_BACKEND != "torch":
+        # Sweeping these would time the same configuration under different labels
+        args.sizes = [model.size]
+        args.threads = [detector_backends.DETECTOR_THREADS]
+
+    rows = []
+    for threads in args.threads:
+        for size in args.sizes:
+            for batch_size in args.batch_sizes:
+                row = bench_forward(model, images, size, batch_size, threads, args.iterations, args.warmup)
+                rows.append(row)
+                print(
+                    f"backend={model_registry.DETECTOR_BACKEND} threads={threads:<2} size={size:<4} batch={batch_size:<2} "
+                    f"p50 {row['batch_latency']['p50_ms']:.1f} ms/batch, {row['images_per_second']:.1f} img/s"
+                )
+
+    torch = sys.modules.get("torch")
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "detector_backend": model_registry.DETECTOR_BACKEND,
+        "host": {
+            "python": platform.python_version(),
+            "torch": torch.__version__ if torch else None,
+            "cpus": os.cpu_count(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+        },
+        "model": model_registry.get_model_stats(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "load_seconds": load_seconds,
+        "decode": decode,
+        "forward": rows,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Model load {load_seconds:.2f}s, decode p50 {decode['p50_ms']:.1f} ms. Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""End-to-end load test for the KYC endpoints against local fakes.
+
+Runs the FastAPI app from main.py in-process with an in-memory MinIO, a fake
+aiomysql pool and a stub face backend, then drives concurrent KYC sessions
+(liveness -> front -> back -> face compare) and reports RPS and latency
+percentiles per endpoint.
+
+Face comparisons queued by the document endpoints run inline by default
+(--face-compare-mode), so their latency is part of the front/back numbers
+rather than hidden in the background job queue.
+
+    python -m benchmarks.load_test --sessions 200 --concurrency 16 --corpus samples/ids --output bench.json
+
+The real YOLOv5 detector is used unless --stub-detector is given.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import socket
+import argparse
+import tempfile
+import platform
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+# Settings the service reads at import time; real credentials are never needed
+os.environ.setdefault("MINIO_URL", "http://127.0.0.1:9")
+os.environ.setdefault("MINIO_BUCKET", "bench")
+os.environ.setdefault("MODEL_LOAD_MODE", "eager")
+os.environ.setdefault("FACE_COMPARE_CACHE_BACKEND", "none")  # Repeated corpus images would otherwise hit the cache
+os.environ["FACE_COMPARE_BACKEND"] = "stub"
+if "--face-compare-mode" in sys.argv[1:-1]:
+    os.environ["FACE_COMPARE_MODE"] = sys.argv[sys.argv.index("--face-compare-mode") + 1]
+os.environ.setdefault("FACE_COMPARE_MODE", "inline")
+os.environ.setdefault("FACE_COMPARE_JOBS_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-"), "face_compare_jobs.sqlite3"))
+
+import requests
+import uvicorn
+from benchmarks.common import load_corpus, synthetic_corpus, git_revision
+
+ENDPOINTS = {
+    "liveness": "/liveness/post-data",
+    "front": "/document-detection/inference/front",
+    "back": "/document-detection/inference/back",
+    "face_compare": "/face/compare",
+}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _install_fakes(args):
+    from benchmarks import fakes
+    from database import dbconfig
+    from utilities import config, face_backends, batch_inference, model_registry
+
+    config._client = fakes.FakeMinio(latency=args.minio_latency)
+
+    async def init_fake_pool():
+        dbconfig.db_pool = dbconfig.InstrumentedPool(fakes.FakePool(latency=args.db_latency))
+
+    dbconfig.init_db_pool = init_fake_pool
+
+    os.makedirs("/output", exist_ok=True)  # /face/compare stages its uploads there
+
+    fakes.StubFaceBackend.latency = args.face_latency
+    face_backends.register_backend("stub", fakes.StubFaceBackend)
+    face_backends.FACE_COMPARE_BACKEND = "stub"
+
+    if args.stub_detector:
+        detector = fakes.StubDetector(latency=args.detector_latency)
+        batch_inference.get_model = lambda name: detector
+        model_registry.MODEL_LOAD_MODE = "lazy"  # Don't load best.pt at startup just to ignore it
+
+
+def _start_server(port):
+    from main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise SystemExit("Server failed to start")
+        time.sleep(0.05)
+    return server, thread
+
+
+def _run_session(base_url, corpus, results, lock):
+    session = requests.Session()
+    msisdn = random.randint(9800000000, 9899999999)
+    session_id = str(uuid.uuid4())
+    image = random.choice(corpus)
+
+    calls = [
+        ("liveness", dict(
+            files={"referenceImage": ("liveness.jpg", image, "image/jpeg")},
+            data={
+                "confidence": "98.2", "sessionId": session_id, "csid": "bench",
+                "boundingBox": json.dumps({"Width": 0.4, "Height": 0.5, "Left": 0.3, "Top": 0.2}),
+                "msisdn": str(msisdn), "status": "SUCCEEDED",
+            },
+        )),
+        ("front", dict(
+            files={"file": ("front.jpg", image, "image/jpeg")},
+            data={"session_id": session_id, "csid": "bench", "msisdn": str(msisdn)},
+        )),
+        ("back", dict(
+            files={"file": ("back.jpg", image, "image/jpeg")},
+            data={"session_id": session_id, "csid": "bench", "msisdn": str(msisdn)},
+        )),
+        ("face_compare", dict(
+            files={
+                "document_front": (f"{session_id}_front.jpg", image, "image/jpeg"),
+                "liveness_document": (f"{session_id}_liveness.jpg", image, "image/jpeg"),
+            },
+            data={"session_id": session_id, "csid": "bench", "msisdn": str(msisdn)},
+        )),
+    ]
+
+    for name, kwargs in calls:
+        start = time.perf_counter()
+        try:
+            ok = session.post(base_url + ENDPOINTS[name], timeout=120, **kwargs).status_code < 400
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            results[name].append((elapsed, ok))
+        if not ok:
+            break  # Later stages depend on this one
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(q * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def _summarise(samples, wall_seconds):
+    latencies = sorted(elapsed for elapsed, _ in samples)
+    errors = sum(1 for _, ok in samples if not ok)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "rps": len(samples) / wall_seconds if wall_seconds else 0.0,
+        "mean_ms": 1000 * sum(latencies) / len(latencies) if latencies else None,
+        **{
+            f"p{int(q * 100)}_ms": 1000 * _percentile(latencies, q) if latencies else None
+            for q in (0.5, 0.9, 0.95, 0.99)
+        },
+        "max_ms": 1000 * latencies[-1] if latencies else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=100, help="KYC sessions to run")
+    parser.add_argument("--concurrency", type=int, default=8, help="Sessions in flight at once")
+    parser.add_argument("--warmup", type=int, default=5, help="Sessions run before measuring")
+    parser.add_argument("--corpus", help="Directory of sample ID images (synthetic images if omitted)")
+    parser.add_argument("--stub-detector", action="store_true", help="Replace YOLOv5 with a fixed-latency stub")
+    parser.add_argument("--detector-latency", type=float, default=0.05, help="Stub detector seconds per image")
+    parser.add_argument("--face-latency", type=float, default=0.15, help="Stub face backend seconds per call")
+    parser.add_argument("--minio-latency", type=float, default=0.0, help="Fake MinIO seconds per call")
+    parser.add_argument("--db-latency", type=float, default=0.0, help="Fake MySQL seconds per call")
+    parser.add_argument("--face-compare-mode", choices=("inline", "background"), default="inline",
+                        help="FACE_COMPARE_MODE for the app; read before it is imported")
+    parser.add_argument("--output", default="bench_output.json", help="Where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    # Synthetic phone-sized photos are only meaningful together with --stub-detector
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(4, 1200, 1600)
+    _install_fakes(args)
+
+    port = _free_port()
+    server, thread = _start_server(port)
+    base_url = f"http://127.0.0.1:{port}{os.getenv('BASE_URL', '/api/v1')}"
+
+    lock = threading.Lock()
+    warmup_results = {name: [] for name in ENDPOINTS}
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(lambda _: _run_session(base_url, corpus, warmup_results, lock), range(args.warmup)))
+
+    results = {name: [] for name in ENDPOINTS}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(lambda _: _run_session(base_url, corpus, results, lock), range(args.sessions)))
+    wall_seconds = time.perf_counter() - start
+
+    server.should_exit = True
+    thread.join(timeout=30)
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "host": {"python": platform.python_version(), "cpus": os.cpu_count(), "machine": platform.machine()},
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "wall_seconds": wall_seconds,
+        "sessions_per_second": args.sessions / wall_seconds if wall_seconds else 0.0,
+        "endpoints": {name: _summarise(samples, wall_seconds) for name, samples in results.items()},
+    }
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for name, summary in report["endpoints"].items():
+        print(
+            f"{name:>12}: {summary['requests']} req, {summary['errors']} err, {summary['rps']:.1f} rps, "
+            f"p50 {summary['p50_ms'] or 0:.1f} ms, p99 {summary['p99_ms'] or 0:.1f} ms"
+        )
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""Accuracy-vs-speed comparison of the INT8 document detector against FP32.
+
+Runs the FP32 reference and the INT8 graph over the same ID images, one image at
+a time, and reports how often the top detection's class agrees, the IoU between
+the top boxes, the confidence drift and the per-image latency of each model.
+
+    python -m benchmarks.quantization_eval --corpus samples/ids --output quantization_eval.json
+    python -m benchmarks.quantization_eval --corpus samples/ids --reference onnx
+
+By default the reference is the best.pt torch model served today (DOCUMENT_MODEL_PATH),
+so the report covers export and quantization together. --reference onnx compares
+against the FP32 best.onnx instead, isolating the quantization step. The candidate
+defaults to best.int8.onnx, matching what scripts/quantize_detector.py writes.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+from datetime import datetime, timezone
+
+from utilities.image_utils import decode_image
+from utilities.model_registry import MODEL_PATHS, YOLO_REPO_DIR
+from utilities.detector_backends import OnnxDetector
+from benchmarks.common import load_corpus, timings, git_revision
+
+
+def _iou(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _run(detector, images, warmup):
+    for image in images[:warmup]:
+        detector([image])
+    detections, samples = [], []
+    for image in images:
+        start = time.perf_counter()
+        results = detector([image])
+        samples.append(time.perf_counter() - start)
+        detections.append(results.xyxy[0].tolist())
+    return detections, samples
+
+
+def compare(reference, candidate):
+    """Agreement of the top (highest-confidence) detection per image, which is the row the routers act on."""
+    class_agree, both_found, ious, conf_drift = 0, 0, [], []
+    for ref, cand in zip(reference, candidate):
+        if not ref or not cand:
+            class_agree += int(not ref and not cand)
+            continue
+        both_found += 1
+        class_agree += int(int(ref[0][5]) == int(cand[0][5]))
+        ious.append(_iou(ref[0][:4], cand[0][:4]))
+        conf_drift.append(abs(ref[0][4] - cand[0][4]))
+
+    ious.sort()
+    return {
+        "images": len(reference),
+        "class_agreement": class_agree / len(reference) if reference else None,
+        "detected_by_both": both_found,
+        "missed_by_candidate": sum(1 for ref, cand in zip(reference, candidate) if ref and not cand),
+        "extra_in_candidate": sum(1 for ref, cand in zip(reference, candidate) if cand and not ref),
+        "top_box_iou": {
+            "mean": statistics.fmean(ious),
+            "p5": ious[int(0.05 * len(ious))],
+            "min": ious[0],
+        } if ious else None,
+        "mean_confidence_drift": statistics.fmean(conf_drift) if conf_drift else None,
+    }
+
+
+def _load_reference(kind, path):
+    if kind == "onnx":
+        return OnnxDetector(path)
+    import torch
+    # Same loading as DETECTOR_BACKEND=torch; AutoShape letterboxes to 640 like the export
+    return torch.hub.load(str(YOLO_REPO_DIR), "custom", path=path, source="local", force_reload=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", required=True, help="Directory of sample ID images")
+    parser.add_argument("--images", type=int, default=500, help="Images taken from the corpus")
+    parser.add_argument("--reference", choices=("torch", "onnx"), default="torch", help="FP32 model to compare against")
+    parser.add_argument("--fp32", help="Reference weights; best.pt for torch, best.onnx for onnx by default")
+    parser.add_argument("--int8", default=str(MODEL_PATHS["document"].with_suffix(".int8.onnx")))
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed images per model")
+    parser.add_argument("--output", default="quantization_eval.json", help="Where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    if args.fp32 is None:
+        document_model = MODEL_PATHS["document"]
+        args.fp32 = str(document_model if args.reference == "torch" else document_model.with_suffix(".onnx"))
+
+    images = [decode_image(image_bytes)[0] for image_bytes in load_corpus(args.corpus, args.images)]
+    fp32_detections, fp32_samples = _run(_load_reference(args.reference, args.fp32), images, args.warmup)
+    int8_detections, int8_samples = _run(OnnxDetector(args.int8), images, args.warmup)
+
+    fp32_latency, int8_latency = timings(fp32_samples), timings(int8_samples)
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "host": {"python": platform.python_version(), "cpus": os.cpu_count(), "machine": platform.machine()},
+        "models": {
+            "fp32": {"reference": args.reference, "path": args.fp32, "size_mb": round(os.path.getsize(args.fp32) / 2 ** 20, 1), "latency": fp32_latency},
+            "int8": {"path": args.int8, "size_mb": round(os.path.getsize(args.int8) / 2 ** 20, 1), "latency": int8_latency},
+        },
+        "speedup_p50": fp32_latency["p50_ms"] / int8_latency["p50_ms"],
+        "accuracy": compare(fp32_detections, int8_detections),
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    accuracy = report["accuracy"]
+    iou = accuracy["top_box_iou"]
+    overlap = f"top-box IoU mean {iou['mean']:.3f} / min {iou['min']:.3f}" if iou else "no image detected by both"
+    print(f"class agreement {accuracy['class_agreement']:.1%}, {overlap}")
+    print(
+        f"p50 {fp32_latency['p50_ms']:.1f} ms (fp32) vs {int8_latency['p50_ms']:.1f} ms (int8), "
+        f"{report['speedup_p50']:.2f}x. Report written to {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
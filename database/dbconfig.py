@@ -1,6 +1,10 @@
 import aiomysql
+import asyncio
 import os
+import time
+from collections import deque
 from dotenv import load_dotenv
+from utilities.metrics import Histogram
 
 load_dotenv()
 
@@ -12,14 +16,136 @@ db_config = {
        "db": os.getenv("MYSQL_DB"),
    }
 
+pool_config = {
+       "minsize": int(os.getenv("MYSQL_POOL_MINSIZE", 1)),          # Connections opened at startup
+       "maxsize": int(os.getenv("MYSQL_POOL_MAXSIZE", 10)),         # Hard cap per worker process
+       "pool_recycle": int(os.getenv("MYSQL_POOL_RECYCLE", 3600)),  # Seconds before a connection is replaced
+       "connect_timeout": int(os.getenv("MYSQL_CONNECT_TIMEOUT", 10)),
+   }
+
+MYSQL_ACQUIRE_TIMEOUT = float(os.getenv("MYSQL_ACQUIRE_TIMEOUT", 5))         # Seconds to wait for a free connection
+MYSQL_SLOW_QUERY_SECONDS = float(os.getenv("MYSQL_SLOW_QUERY_SECONDS", 0.5))  # Queries slower than this are kept
+
+query_latency = {}
+slow_queries = deque(maxlen=50)
+
+
+def _query_name(query: str) -> str:
+    # "CALL SP_INSERT_FACECOMPARE(%s, ...)" -> "CALL SP_INSERT_FACECOMPARE"
+    return " ".join(query.split("(", 1)[0].split()[:3])
+
+
+def _record_query(name: str, seconds: float):
+    histogram = query_latency.get(name)
+    if histogram is None:
+        histogram = query_latency.setdefault(name, Histogram())
+    histogram.observe(seconds)
+    if seconds >= MYSQL_SLOW_QUERY_SECONDS:
+        slow_queries.append({"query": name, "seconds": round(seconds, 4), "at": time.time()})
+
+
+class TimedCursor(aiomysql.Cursor):
+    """Cursor that records the latency of every execute and callproc."""
+
+    async def execute(self, query, args=None):
+        start = time.perf_counter()
+        try:
+            return await super().execute(query, args)
+        finally:
+            _record_query(_query_name(query), time.perf_counter() - start)
+
+    async def callproc(self, procname, args=()):
+        start = time.perf_counter()
+        try:
+            return await super().callproc(procname, args)
+        finally:
+            _record_query(f"CALL {procname}", time.perf_counter() - start)
+
+
+class _TimedAcquire:
+    def __init__(self, pool):
+        self._pool = pool
+        self._conn = None
+
+    async def __aenter__(self):
+        self._conn = await self._pool._acquire()
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._pool.release(self._conn)
+        self._conn = None
+
+
+class InstrumentedPool:
+    """Wraps the aiomysql pool with acquire timeouts and saturation metrics."""
+
+    def __init__(self, pool):
+        self._pool = pool
+        self.acquire_wait = Histogram()
+        self.acquire_timeouts = 0
+        self.waiting = 0
+
+    def acquire(self):
+        return _TimedAcquire(self)
+
+    async def _acquire(self):
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            return await asyncio.wait_for(self._pool.acquire(), MYSQL_ACQUIRE_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.acquire_timeouts += 1
+            raise TimeoutError(f"Timed out after {MYSQL_ACQUIRE_TIMEOUT}s waiting for a database connection")
+        finally:
+            self.waiting -= 1
+            self.acquire_wait.observe(time.perf_counter() - start)
+
+    async def release(self, conn):
+        await self._pool.release(conn)
+
+    def close(self):
+        self._pool.close()
+
+    async def wait_closed(self):
+        await self._pool.wait_closed()
+
+    def stats(self):
+        return {
+            "minsize": self._pool.minsize,
+            "maxsize": self._pool.maxsize,
+            "size": self._pool.size,
+            "in_use": self._pool.size - self._pool.freesize,
+            "idle": self._pool.freesize,
+            "waiting": self.waiting,
+            "acquire_timeouts": self.acquire_timeouts,
+            "acquire_wait": self.acquire_wait.snapshot(),
+        }
+
 
 async def init_db_pool():
        global db_pool
-       db_pool = await aiomysql.create_pool(
+       pool = await aiomysql.create_pool(
            host=db_config["host"],
            port=db_config["port"],
            user=db_config["user"],
            password=db_config["password"],
            db=db_config["db"],
            autocommit=True,
+           cursorclass=TimedCursor,
+           **pool_config,
        )
+       db_pool = InstrumentedPool(pool)
+
+
+async def close_db_pool():
+       db_pool.close()
+       await db_pool.wait_closed()
+
+
+def get_pool_stats():
+       """Pool saturation, acquire waits and per-query latency for the stats API."""
+       return {
+           "pool": db_pool.stats() if "db_pool" in globals() else None,
+           "queries": {name: histogram.snapshot() for name, histogram in query_latency.items()},
+           "slow_queries": list(slow_queries),
+       }
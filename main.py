@@ -1,20 +1,49 @@
 from fastapi import FastAPI
-from routers import document_detection_front, document_detection_back, face_comparision, liveness
+from routers import document_detection_front, document_detection_back, face_comparision, liveness, stats, health
 from contextlib import asynccontextmanager
 import os
 from dotenv import load_dotenv
 from database import dbconfig
+from utilities import model_registry, startup, face_compare_jobs
+from utilities.config import get_minio_client
+from utilities.face_backends import get_face_backend
+from utilities.batch_inference import document_detector
+from utilities.inference_pool import shutdown_pool
+from utilities.logger import logger_handler
+from utilities.metrics import MetricsMiddleware
+from utilities.image_cache import ServedByMiddleware, SERVED_BY_HEADER_ENABLED
+from utilities.tracing import close_exporter
 
 # Load environment variables
 load_dotenv()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await dbconfig.init_db_pool()
+    # Pools and clients don't depend on each other, so bring them up concurrently
+    await startup.run_parallel(
+        db_pool=dbconfig.init_db_pool,
+        minio_client=get_minio_client,
+        face_backend=lambda: get_face_backend().warm_up(),
+    )
+    await logger_handler.start()
+    await face_compare_jobs.start()  # Resumes jobs left queued or running by a previous process
+    # Weights load (eager mode) and warm up in the background so /health answers at once; /ready waits for them.
+    # Runs in lazy mode too, so workers forked by serve_forked warm the weights preloaded in the parent.
+    startup.run_in_background("models", model_registry.load_models)
+    startup.mark_lifespan_ready()
     yield
+    startup.cancel_background()
+    await face_compare_jobs.stop()
+    await document_detector.stop()
+    shutdown_pool()
+    await logger_handler.stop()  # Flush buffered log rows while the pool is still open
     await dbconfig.close_db_pool()
+    close_exporter()
 
 app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+if SERVED_BY_HEADER_ENABLED:
+    app.add_middleware(ServedByMiddleware)
 
 # Environment variables
 base_url = os.getenv("BASE_URL", "/api/v1")  # Fallback to "/api/v1"
@@ -26,8 +55,16 @@ app.include_router(document_detection_front.router, prefix=base_url)
 app.include_router(document_detection_back.router, prefix=base_url)
 app.include_router(face_comparision.router, prefix=base_url)
 app.include_router(liveness.router, prefix=base_url)
+# Operational endpoints stay off the customer-facing API prefix
+app.include_router(stats.router)
+app.include_router(stats.metrics_router)
+app.include_router(health.router)
 
 # Main entry point
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host=host, port=port)
+    from utilities.serving import WEB_WORKERS, serve_forked
+    if WEB_WORKERS > 1:
+        serve_forked(app, host, port, WEB_WORKERS)
+    else:
+        import uvicorn
+        uvicorn.run(app, host=host, port=port)
@@ -1,24 +1,21 @@
-import tempfile
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form
 from schema.schemas import Detection, DetectionResponse
 from utilities.logger import logger
+from utilities.tracing import traced
 from database import dbconfig
-from utilities.face_compare import face_compare_auto
+from utilities import face_compare_jobs
+from utilities import session_state, image_cache
+from utilities.session_state import fetch_photo_paths
 import shutil
 import os
-import torch
 import json
 import numpy as np
 from dotenv import load_dotenv
 from PIL import Image
 from io import BytesIO
-from utilities.config import get_image_save_path_minio, client
-# Path to the cloned YOLOv5 repository
-#If you have linux (or deploying for linux) use:
-from pathlib import Path
-import pathlib
-temp = pathlib.PosixPath
-pathlib.WindowsPath = pathlib.PosixPath
+from utilities.config import get_image_save_path_minio
+from utilities.document_detection import detect_uploaded_document
+from utilities.metrics import stage
 
 load_dotenv()
 
@@ -26,20 +23,8 @@ router = APIRouter()
 
 MINIO_BUCKET = os.getenv("MINIO_BUCKET")
 
-# Paths to the YOLOv5 repository and model file
-YOLO_REPO_DIR = Path("yolov5").resolve()  # YOLOv5 repository path
-MODEL_PATH = Path("yolo/best.pt").resolve()  # Model file path
-
-# Load the YOLOv5 model using the local repository
-model = torch.hub.load(
-    str(YOLO_REPO_DIR),  
-    'custom',            
-    path=str(MODEL_PATH),  
-    source='local',       
-    force_reload=False    
-)
-
 @router.post("/document-detection/inference/front")
+@traced("document_detection_front")
 async def detect_document(
     file: UploadFile = File(...),
     session_id: str = Form(...),
@@ -52,46 +37,22 @@ async def detect_document(
     document_photo_path_front = get_image_save_path_minio(msisdn, session_id, "Id_front")
     
     try:
-        # Upload the file to MinIO
-        file_content = await file.read()
-
-        # Save the uploaded file directly to MinIO
-        with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp_file:
-            tmp_filename = tmp_file.name
-            with open(tmp_filename, 'wb') as temp_file:
-                temp_file.write(file_content)
-
-        # Upload to MinIO using the MinIO client and the correct path
-        client.fput_object(
-            bucket_name=MINIO_BUCKET,  # Bucket name
-            object_name=document_photo_path_front,  # Path in MinIO
-            file_path=tmp_filename  # Local temporary file path
-        )
-        logger.info(f"File successfully uploaded to MinIO at: {document_photo_path_front}")
-
-        # Retrieve the image from MinIO for inference
-        response = client.get_object(MINIO_BUCKET, document_photo_path_front)
-        
-        # Save the retrieved image to a temporary file
-        with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp_file:
-            tmp_filename = tmp_file.name
-            with open(tmp_filename, 'wb') as temp_file:
-                temp_file.write(response.read())
-
-        logger.info(f"Image successfully retrieved from MinIO: {document_photo_path_front}")
-
-        # Run inference with YOLOv5 by passing the retrieved image file path
-        results = model(tmp_filename) 
-        if len(results.xyxy[0]) == 0:
+        # Read the uploaded file
+        with stage("upload_read"):
+            file_content = await file.read()
+
+        # Store in MinIO and run YOLOv5 inference on the uploaded image
+        xyxy, names = await detect_uploaded_document(file_content, document_photo_path_front)
+        if len(xyxy) == 0:
             raise HTTPException(status_code=400, detail="No document detected.")
 
-        detection_data = results.xyxy[0].tolist()[0]
+        detection_data = xyxy.tolist()[0]
 
         if len(detection_data) < 6: 
             raise HTTPException(status_code = 400, detail = "Invalid detection data format.")
 
         *box, confidence, cls = detection_data
-        class_name = results.names[int(cls)]
+        class_name = names[int(cls)]
         id_type_mapping = {
             "CS": 1,  # Citizenship
             "DL": 2,  # Driving License
@@ -114,36 +75,33 @@ async def detect_document(
             msisdn=msisdn
         )
         # Insert detections into DB
-        dd_status_decoded = await insert_detections_into_db([detection])
+        with stage("sp_insert_dd"):
+            dd_status_decoded = await insert_detections_into_db([detection])
+        if dd_status_decoded == 1:  # Only an accepted front; 0 sends the user back to retake it
+            session_state.record_path(msisdn, session_id, session_state.DOCUMENT_FRONT, document_photo_path_front)
+            image_cache.put(document_photo_path_front, file_content)
         if id_type == 2:
-            async with dbconfig.db_pool.acquire() as conn:
-                async with conn.cursor() as cursor:
-                    await cursor.callproc('SP_FETCH_PHOTO_URL', (msisdn,))
-                    paths_result = await cursor.fetchall()
-
-                    if not paths_result or len(paths_result[0]) < 2:
-                        raise HTTPException(status_code=500, detail="Failed to fetch required document paths.")
-                    
-                    liveness_document_path, document_front_path = paths_result[0]
-
-                    # Normalize MinIO paths
-                    document_front_path = os.path.normpath(document_front_path)
-                    liveness_document_path = os.path.normpath(liveness_document_path)
-
-            result = await face_compare_auto(
-                document_front=document_front_path,
-                liveness_document=liveness_document_path,
-                session_id=session_id,
-                csid=csid,
-                msisdn=msisdn
-            )
-            logger.info(f"Face Compare result: {result}")  
+            with stage("fetch_photo_paths"):
+                liveness_document_path, document_front_path = await fetch_photo_paths(msisdn, session_id)
+
+            # Queued for the background workers unless FACE_COMPARE_MODE=inline
+            with stage("face_compare"):
+                job_id, result = await face_compare_jobs.submit(
+                    document_front=document_front_path,
+                    liveness_document=liveness_document_path,
+                    session_id=session_id,
+                    csid=csid,
+                    msisdn=msisdn
+                )
+            if job_id is None:
+                logger.info(f"Face Compare result: {result}")
             payload = {
                 "ResponseData": {
                     "IsDocumentScanCompleted": True,
                     "IsVerified": False,
                     "IsBackDocumentNeed": False,
                     "DocumentType": id_type,
+                    "FaceCompareJobId": job_id,
                 },
                 "ResponseCode": 300,
                 "ResponseDescription": "Success"
@@ -174,6 +132,8 @@ async def detect_document(
         logger.info("Document detection inference completed successfully.")
         return payload
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error during document detection: {e}")
         raise HTTPException(status_code=500, detail=str(e))
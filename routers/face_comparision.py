@@ -1,17 +1,20 @@
 from fastapi import APIRouter, UploadFile, HTTPException, File, Form
 from schema.schemas import FaceComparisonResponse, FaceComparisonResult
-from utilities.aws_rekognition import run_face_comparison
+from utilities.face_backends import run_face_comparison
 from utilities.logger import logger
+from utilities.tracing import traced
 import os
 import shutil
 import json
 from database import dbconfig
 from utilities.image_cropper import image_cropper
 from utilities.config import get_image_save_path_minio
+from utilities import face_compare_jobs
 
 router = APIRouter()
 
 @router.post("/face/compare", response_model=FaceComparisonResponse)
+@traced("face_compare")
 async def face_compare(
     document_front: UploadFile = File(...),
     liveness_document: UploadFile = File(...),
@@ -109,6 +112,24 @@ async def face_compare(
     #     confidence = confidence
     # )
 
+@router.get("/face/compare/jobs/{job_id}")
+async def face_compare_job_status(job_id: str):
+    """Status of a background face comparison queued by the document detection endpoints."""
+    job = await face_compare_jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Face compare job not found.")
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "msisdn": job["msisdn"],
+        "session_id": job["session_id"],
+        "result": job["result"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+
 async def insert_face_compare_result(session_id, csid, similarity, confidence, details, msisdn, Cropped_img_path):
     sp_query = "CALL SP_INSERT_FACECOMPARE(%s, %s, %s, %s, %s, %s, %s)"
     async with dbconfig.db_pool.acquire() as conn:
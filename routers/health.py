@@ -0,0 +1,28 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from database import dbconfig
+from utilities import model_registry, startup
+
+# Served at the root for the orchestrator's liveness and readiness probes
+router = APIRouter()
+
+@router.get("/health")
+async def health():
+    """Liveness: the process is up and serving requests."""
+    return {"status": "ok"}
+
+@router.get("/ready")
+async def ready():
+    """Readiness: 200 only once pools are open and, in eager mode, the models are loaded and warmed."""
+    checks = {
+        "startup": startup.is_ready(),
+        "db_pool": "db_pool" in vars(dbconfig),
+        "models": model_registry.MODEL_LOAD_MODE != "eager" or all(
+            model_registry.is_loaded(name) for name in model_registry.MODEL_PATHS
+        ),
+    }
+    is_ready = all(checks.values())
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={"status": "ready" if is_ready else "starting", "checks": checks, "startup": startup.get_startup_report()},
+    )
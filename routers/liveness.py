@@ -1,20 +1,25 @@
-from fastapi import APIRouter, HTTPException, Request, File, UploadFile, Form
+from fastapi import APIRouter, HTTPException, Request, File, UploadFile, Form, BackgroundTasks
 from fastapi.responses import JSONResponse
 import json
-from io import BytesIO
 from dotenv import load_dotenv
 import os
 from database import dbconfig
-from utilities.config import get_image_save_path_minio, client
+from utilities.config import get_image_save_path_minio
+from utilities import storage, session_state, image_cache
+from utilities.liveness_features import precompute_enabled, precompute_liveness_features
 from utilities.logger import logger
+from utilities.tracing import traced
+from utilities.metrics import stage
 
 load_dotenv()
 router = APIRouter()
 MINIO_BUCKET = os.getenv("MINIO_BUCKET")
 
 @router.post("/liveness/post-data")
+@traced("liveness_post_data")
 async def post_data(
     request: Request,
+    background_tasks: BackgroundTasks,
     referenceImage: UploadFile = File(...),
     confidence: float = Form(...),
     sessionId: str = Form(...),
@@ -37,21 +42,24 @@ async def post_data(
         livenessPhotoPath = get_image_save_path_minio(msisdn, sessionId, "Liveness")
         logger.info(f"Liveness photo will be saved at: {livenessPhotoPath}")
 
-        file_content = await referenceImage.read()
-        file_size = len(file_content)
+        with stage("upload_read"):
+            file_content = await referenceImage.read()
         try:
-            client.put_object(
-                bucket_name=MINIO_BUCKET,
-                object_name=livenessPhotoPath,
-                data=BytesIO(file_content),
-                length=file_size,
-                content_type=referenceImage.content_type
-            )
+            with stage("minio_put"):
+                await storage.put_object(
+                    livenessPhotoPath,
+                    file_content,
+                    content_type=referenceImage.content_type
+                )
             logger.info(f"File uploaded successfully to MinIO: {livenessPhotoPath}")
         except Exception as e:
             logger.error(f"Error uploading to MinIO: {e}")
             raise HTTPException(status_code=500, detail="File upload failed")
 
+        if precompute_enabled():
+            # Runs after the response is sent; face compare falls back to the full photo until it lands
+            background_tasks.add_task(precompute_liveness_features, livenessPhotoPath, file_content)
+
         liveness_data = {
             "SessionId": sessionId,
             "MSISDN": msisdn,
@@ -64,21 +72,25 @@ async def post_data(
         }
 
         try:
-            lv_status = await insert_liveness_result(
-                msisdn=liveness_data["MSISDN"],
-                sessionId=liveness_data["SessionId"],
-                confidence=liveness_data["Confidence"],
-                csid=liveness_data["CSID"],
-                livenessPhotoPath=liveness_data["LivenessPhotoPath"],
-                bounding_box=liveness_data["BoundingBox"],
-                details=liveness_data["Details"]
-            )
+            with stage("sp_insert_liveness"):
+                lv_status = await insert_liveness_result(
+                    msisdn=liveness_data["MSISDN"],
+                    sessionId=liveness_data["SessionId"],
+                    confidence=liveness_data["Confidence"],
+                    csid=liveness_data["CSID"],
+                    livenessPhotoPath=liveness_data["LivenessPhotoPath"],
+                    bounding_box=liveness_data["BoundingBox"],
+                    details=liveness_data["Details"]
+                )
             
             if lv_status is None:
                 logger.error("Database operation failed: No status returned")
                 raise HTTPException(status_code=500, detail="Database operation failed")
             
             logger.info(f"Database operation completed with status: {lv_status}")
+            if lv_status == 1:
+                session_state.record_path(msisdn, sessionId, session_state.LIVENESS, livenessPhotoPath)
+                image_cache.put(livenessPhotoPath, file_content)
             
             payload = {
                 "ResponseData": {
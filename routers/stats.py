@@ -0,0 +1,100 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from database import dbconfig
+from utilities import model_registry, storage, face_compare_cache, face_compare_jobs, session_state, image_cache, metrics, startup
+from utilities.logger import logger_handler
+
+# Both routers are served at the root, outside BASE_URL: /internal/stats for operators and
+# the conventional /metrics path for Prometheus
+router = APIRouter()
+metrics_router = APIRouter()
+
+@router.get("/internal/stats")
+async def get_stats():
+    """Internal runtime stats for sizing pools, caches and workers."""
+    return {
+        "startup": startup.get_startup_report(),
+        "db": dbconfig.get_pool_stats(),
+        "storage": storage.get_storage_stats(),
+        "face_compare_cache": face_compare_cache.get_cache_stats(),
+        "face_compare_jobs": await face_compare_jobs.get_stats(),
+        "session_state": session_state.get_session_state_stats(),
+        "image_cache": image_cache.get_image_cache_stats(),
+        "models": model_registry.get_model_stats(),
+        "logger": logger_handler.get_stats(),
+        "stages": {
+            f"{endpoint} {name}": histogram.snapshot()
+            for (endpoint, name), histogram in metrics.stage_latency.items()
+        },
+    }
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text exposition of pipeline, database, storage and cache metrics."""
+    lines = metrics.render_stage_metrics()
+
+    lines += metrics.format_histogram(
+        "kyc_db_query_duration_seconds",
+        "Latency of each SQL statement or stored procedure.",
+        [({"query": name}, histogram) for name, histogram in dbconfig.query_latency.items()],
+    )
+    if "db_pool" in vars(dbconfig):
+        pool = dbconfig.db_pool
+        pool_stats = pool.stats()
+        lines += metrics.format_histogram(
+            "kyc_db_pool_acquire_wait_seconds",
+            "Time spent waiting for a pooled MySQL connection.",
+            [({}, pool.acquire_wait)],
+        )
+        lines += metrics.format_metric(
+            "kyc_db_pool_connections", "gauge", "MySQL pool connections by state.",
+            [({"state": state}, pool_stats[state]) for state in ("in_use", "idle", "waiting")],
+        )
+        lines += metrics.format_metric(
+            "kyc_db_pool_acquire_timeouts_total", "counter", "Connection acquires that timed out.",
+            [({}, pool_stats["acquire_timeouts"])],
+        )
+
+    storage_stats = storage.get_storage_stats()
+    lines += metrics.format_metric(
+        "kyc_storage_operations_total", "counter", "MinIO operations by type.",
+        [({"operation": op}, stat["count"]) for op, stat in storage_stats.items()],
+    )
+    lines += metrics.format_metric(
+        "kyc_storage_operation_seconds_total", "counter", "Cumulative MinIO operation latency.",
+        [({"operation": op}, stat["total_seconds"]) for op, stat in storage_stats.items()],
+    )
+
+    cache_stats = face_compare_cache.get_cache_stats()
+    lines += metrics.format_metric(
+        "kyc_face_compare_cache_lookups_total", "counter", "Face comparison cache lookups by result.",
+        [({"result": "hit"}, cache_stats["hits"]), ({"result": "miss"}, cache_stats["misses"])],
+    )
+
+    session_stats = session_state.get_session_state_stats()
+    lines += metrics.format_metric(
+        "kyc_session_state_lookups_total", "counter", "Photo path lookups by result; misses call SP_FETCH_PHOTO_URL.",
+        [({"result": "hit"}, session_stats["hits"]), ({"result": "miss"}, session_stats["misses"])],
+    )
+
+    image_stats = image_cache.get_image_cache_stats()
+    lines += metrics.format_metric(
+        "kyc_image_cache_lookups_total", "counter", "Image cache lookups by result; misses download from MinIO.",
+        [({"result": "hit"}, image_stats["hits"]), ({"result": "miss"}, image_stats["misses"])],
+    )
+    lines += metrics.format_metric(
+        "kyc_image_cache_bytes", "gauge", "Encoded image bytes held by the image cache.",
+        [({}, image_stats["bytes"])],
+    )
+    lines += metrics.format_metric(
+        "kyc_image_cache_evictions_total", "counter", "Images evicted to stay within IMAGE_CACHE_MAX_BYTES.",
+        [({}, image_stats["evictions"])],
+    )
+
+    log_stats = logger_handler.get_stats()
+    lines += metrics.format_metric(
+        "kyc_db_log_records_total", "counter", "Log records by outcome.",
+        [({"outcome": outcome}, log_stats[outcome]) for outcome in ("written", "dropped", "failed")],
+    )
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,49 @@
+"""Export the YOLOv5 document detector for DETECTOR_BACKEND=onnx / torchscript.
+
+    python -m scripts.export_detector --formats onnx,torchscript
+
+Runs the export entry point of the cloned YOLOv5 repository, so it only needs a
+YOLOv5 checkout on the machine doing the export. The graphs are written next to
+DOCUMENT_MODEL_PATH (best.onnx, best.torchscript), where model_registry looks for them.
+"""
+import sys
+import argparse
+
+from utilities.model_registry import MODEL_PATHS, YOLO_REPO_DIR
+from utilities.detector_backends import DETECTOR_IMAGE_SIZE
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--weights", default=str(MODEL_PATHS["document"]), help="YOLOv5 checkpoint to export")
+    parser.add_argument("--formats", default="onnx,torchscript", help="Comma separated: onnx, torchscript")
+    parser.add_argument("--imgsz", type=int, default=DETECTOR_IMAGE_SIZE, help="Square input edge")
+    parser.add_argument("--opset", type=int, default=17, help="ONNX opset")
+    parser.add_argument("--static-batch", action="store_true", help="Export ONNX with a fixed batch of 1")
+    parser.add_argument("--simplify", action="store_true", help="Run onnx-simplifier on the exported graph")
+    args = parser.parse_args(argv)
+
+    formats = tuple(f.strip() for f in args.formats.split(",") if f.strip())
+    unknown = set(formats) - {"onnx", "torchscript"}
+    if unknown:
+        raise SystemExit(f"Unsupported formats: {', '.join(sorted(unknown))}")
+
+    sys.path.insert(0, str(YOLO_REPO_DIR))
+    import export  # yolov5/export.py
+
+    files = export.run(
+        weights=args.weights,
+        imgsz=(args.imgsz, args.imgsz),
+        batch_size=1,
+        device="cpu",
+        include=formats,
+        dynamic=not args.static_batch,  # Lets ONNX Runtime take a whole micro-batch in one call
+        simplify=args.simplify,
+        opset=args.opset,
+    )
+    for path in files:
+        print(f"Exported {path}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""Quantize the exported ONNX document detector to INT8 for DETECTOR_BACKEND=onnx-int8.
+
+    python -m scripts.quantize_detector --mode static --calibration samples/ids
+    python -m scripts.quantize_detector --mode dynamic
+
+Static mode calibrates activation ranges over sample ID images; dynamic mode only
+quantizes weights and computes activation ranges at run time. Run
+scripts/export_detector.py first; the result is written as best.int8.onnx next to
+best.onnx. Pass --eval-corpus to print the accuracy-vs-speed report straight away.
+"""
+import os
+import sys
+import argparse
+import tempfile
+
+from utilities.image_utils import decode_image
+from utilities.model_registry import MODEL_PATHS
+from utilities.detector_backends import DETECTOR_IMAGE_SIZE, letterbox
+from benchmarks.common import image_files
+
+
+def _calibration_reader(files, input_name, size):
+    from onnxruntime.quantization import CalibrationDataReader
+    import numpy as np
+
+    class IdImageReader(CalibrationDataReader):
+        """Feeds sample ID images through the same decode and letterbox as serving."""
+
+        def __init__(self):
+            self._files = iter(files)
+
+        def get_next(self):
+            file_path = next(self._files, None)
+            if file_path is None:
+                return None
+            with open(file_path, "rb") as f:
+                image, _ = decode_image(f.read())
+            canvas, _, _ = letterbox(image, size)
+            batch = canvas.transpose(2, 0, 1)[None].astype(np.float32) / 255.0
+            return {input_name: batch}
+
+    return IdImageReader()
+
+
+def _copy_metadata(source, output):
+    """Carry the class names written by YOLOv5's export over to the quantized graph."""
+    import onnx
+
+    model = onnx.load(output)
+    existing = {prop.key for prop in model.metadata_props}
+    for prop in onnx.load(source, load_external_data=False).metadata_props:
+        if prop.key not in existing:
+            entry = model.metadata_props.add()
+            entry.key, entry.value = prop.key, prop.value
+    onnx.save(model, output)
+
+
+def main(argv=None):
+    default_source = MODEL_PATHS["document"].with_suffix(".onnx")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default=str(default_source), help="FP32 ONNX graph from export_detector")
+    parser.add_argument("--output", default=str(MODEL_PATHS["document"].with_suffix(".int8.onnx")))
+    parser.add_argument("--mode", choices=("static", "dynamic"), default="static")
+    parser.add_argument("--calibration", help="Directory of sample ID images (required for static mode)")
+    parser.add_argument("--calibration-images", type=int, default=200, help="Images used for calibration")
+    parser.add_argument("--per-channel", action="store_true", help="Per-channel weight scales (usually more accurate)")
+    parser.add_argument("--imgsz", type=int, default=DETECTOR_IMAGE_SIZE, help="Square input edge used at export")
+    parser.add_argument("--eval-corpus", help="Directory of ID images to compare INT8 against FP32 afterwards")
+    args = parser.parse_args(argv)
+
+    import onnxruntime as ort
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_dynamic, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Symbolic shape inference and constant folding give the quantizer a cleaner graph
+        prepared = os.path.join(tmp_dir, "prepared.onnx")
+        quant_pre_process(args.source, prepared)
+
+        if args.mode == "dynamic":
+            quantize_dynamic(prepared, args.output, weight_type=QuantType.QInt8, per_channel=args.per_channel)
+        else:
+            if not args.calibration:
+                raise SystemExit("--calibration is required for static quantization")
+            input_name = ort.InferenceSession(prepared, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+            reader = _calibration_reader(image_files(args.calibration, args.calibration_images), input_name, args.imgsz)
+            quantize_static(
+                prepared, args.output, reader,
+                quant_format=QuantFormat.QDQ,
+                activation_type=QuantType.QUInt8,
+                weight_type=QuantType.QInt8,
+                per_channel=args.per_channel,
+            )
+
+    _copy_metadata(args.source, args.output)
+    print(f"Wrote {args.mode} INT8 model to {args.output}")
+
+    if args.eval_corpus:
+        from benchmarks import quantization_eval
+        quantization_eval.main([
+            "--corpus", args.eval_corpus, "--reference", "onnx", "--fp32", args.source, "--int8", args.output,
+        ])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
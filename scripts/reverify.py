@@ -0,0 +1,217 @@
+"""Re-run document classification over stored ID images, offline and in bulk.
+
+    python -m scripts.reverify --start 2024-10-01 --end 2024-12-31 --output reverify.jsonl
+
+Lists Photo/<year>/<month>/<day>/ prefixes (the get_image_save_path_minio layout)
+for every day in the range and keeps objects ending in --suffix. Objects are
+downloaded on a thread pool with at most --prefetch images held in memory, then
+classified in batches by --processes worker processes, each running its own copy
+of the configured detector (DETECTOR_BACKEND applies).
+
+One JSON line is appended per object. Re-running with the same --output skips
+objects already classified in the file and retries failed ones, so an
+interrupted run picks up where it stopped.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from collections import deque
+from datetime import date, timedelta
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from utilities.config import get_minio_client, get_minio_day_prefix, MINIO_BUCKET
+
+_model = None
+
+
+def _init_worker(threads: int):
+    """Load the detector once per worker process, limited to its share of the cores."""
+    global _model
+    from utilities import model_registry, detector_backends
+
+    model_registry.TORCH_THREADS = threads
+    if not detector_backends.DETECTOR_THREADS:
+        detector_backends.DETECTOR_THREADS = threads
+    _model = model_registry.get_model("document")
+
+
+def _parse_name(object_name: str, suffix: str):
+    stem = os.path.basename(object_name)[:-len(suffix)] if object_name.endswith(suffix) else object_name
+    msisdn, _, session_id = stem.partition("_")
+    return msisdn, session_id
+
+
+def _classify_batch(items, suffix: str):
+    """Decode and classify one batch of (object_name, bytes); returns one result row per object."""
+    from utilities.image_utils import decode_image
+
+    rows, images, scales, decoded = [], [], [], []
+    for object_name, data in items:
+        msisdn, session_id = _parse_name(object_name, suffix)
+        row = {"object_name": object_name, "msisdn": msisdn, "session_id": session_id}
+        try:
+            image, scale = decode_image(data)
+        except Exception as e:
+            row["error"] = f"decode failed: {e}"
+        else:
+            images.append(image)
+            scales.append(scale)
+            decoded.append(row)
+        rows.append(row)
+
+    if images:
+        try:
+            results = _model(images)
+        except Exception as e:
+            for row in decoded:
+                row["error"] = f"inference failed: {e}"
+            return rows
+        for row, xyxy, scale in zip(decoded, results.xyxy, scales):
+            detections = xyxy.tolist()
+            row["detections"] = len(detections)
+            if detections:
+                *box, confidence, cls = detections[0]
+                row["predicted_class"] = results.names[int(cls)]
+                row["confidence"] = round(float(confidence), 4)
+                row["bounding_box"] = [round(v * scale, 1) for v in box]
+            else:
+                row["predicted_class"] = None
+    return rows
+
+
+def _download(object_name: str):
+    response = get_minio_client().get_object(MINIO_BUCKET, object_name)
+    try:
+        return response.read()
+    finally:
+        response.close()
+        response.release_conn()
+
+
+def _days(start: date, end: date):
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+def _list_objects(start: date, end: date, suffix: str, done: set):
+    client = get_minio_client()
+    for day in _days(start, end):
+        prefix = get_minio_day_prefix(day)
+        for obj in client.list_objects(MINIO_BUCKET, prefix=prefix, recursive=True):
+            if obj.object_name.endswith(suffix) and obj.object_name not in done:
+                yield obj.object_name
+
+
+def _completed(output: str):
+    """Objects an earlier run classified successfully; a torn last line from a crash is ignored."""
+    done = set()
+    if not os.path.exists(output):
+        return done
+    with open(output) as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                continue
+            if "error" not in row:  # Failed objects are retried
+                done.add(row["object_name"])
+    return done
+
+
+def main(argv=None):
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", type=date.fromisoformat, required=True, help="First day, YYYY-MM-DD")
+    parser.add_argument("--end", type=date.fromisoformat, help="Last day (inclusive); defaults to --start")
+    parser.add_argument("--suffix", default="_Id_front.jpg", help="Object name suffix to re-verify")
+    parser.add_argument("--output", default="reverify.jsonl", help="JSON lines results; also the resume checkpoint")
+    parser.add_argument("--batch-size", type=int, default=16, help="Images per forward pass")
+    parser.add_argument("--processes", type=int, default=max(1, cpus // 2), help="Inference worker processes")
+    parser.add_argument("--threads", type=int, default=0, help="Threads per process; default splits the cores")
+    parser.add_argument("--prefetch", type=int, default=128, help="Downloaded images waiting for inference")
+    parser.add_argument("--download-threads", type=int, default=16, help="Concurrent MinIO downloads")
+    args = parser.parse_args(argv)
+
+    end = args.end or args.start
+    threads = args.threads or max(1, cpus // args.processes)
+    done = _completed(args.output)
+    if done:
+        print(f"Resuming: {len(done)} objects already in {args.output}", flush=True)
+
+    names = _list_objects(args.start, end, args.suffix, done)
+    # Spawned, not forked: the parent already runs download threads by the time workers start
+    pool = ProcessPoolExecutor(
+        max_workers=args.processes,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(threads,),
+    )
+    downloads = ThreadPoolExecutor(max_workers=args.download_threads, thread_name_prefix="download")
+
+    counts = {"processed": 0, "errors": 0}
+    started = time.perf_counter()
+
+    with pool, downloads, open(args.output, "a") as out:
+        pending_downloads = deque()
+        batches = set()
+        batch = []
+        exhausted = False
+
+        def write(futures):
+            lines = []
+            for future in futures:
+                for row in future.result():
+                    counts["processed"] += 1
+                    counts["errors"] += "error" in row
+                    lines.append(json.dumps(row) + "\n")
+            out.write("".join(lines))  # One write per finished batch
+            out.flush()
+
+        def submit_batch():
+            nonlocal batch
+            batches.add(pool.submit(_classify_batch, batch, args.suffix))
+            batch = []
+            # Keep every process busy with one batch queued behind it, and no more
+            while len(batches) >= 2 * args.processes:
+                finished, _ = wait(batches, return_when=FIRST_COMPLETED)
+                batches.difference_update(finished)
+                write(finished)
+
+        while True:
+            while not exhausted and len(pending_downloads) < args.prefetch:
+                object_name = next(names, None)
+                if object_name is None:
+                    exhausted = True
+                    break
+                pending_downloads.append((object_name, downloads.submit(_download, object_name)))
+            if not pending_downloads:
+                break
+
+            object_name, future = pending_downloads.popleft()
+            try:
+                batch.append((object_name, future.result()))
+            except Exception as e:
+                counts["processed"] += 1
+                counts["errors"] += 1
+                out.write(json.dumps({"object_name": object_name, "error": f"download failed: {e}"}) + "\n")
+            if len(batch) >= args.batch_size:
+                submit_batch()
+
+        if batch:
+            submit_batch()
+        write(wait(batches).done)
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"Processed {counts['processed']} objects ({counts['errors']} errors) in {elapsed:.1f}s, "
+        f"{counts['processed'] / elapsed if elapsed else 0:.1f} img/s. Results in {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
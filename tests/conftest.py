@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Make the flat top-level packages (utilities, database, ...) importable however pytest is invoked;
+# pytest.ini's pythonpath option is only honoured by pytest 7 and later
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,59 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from utilities import batch_inference
+from utilities.batch_inference import BatchInferenceEngine
+
+
+class FakeModel:
+    """Detects one box per image and rejects images marked as bad, like a model choking on a corrupt input."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, images):
+        self.calls.append(list(images))
+        if "bad" in images:
+            raise RuntimeError("bad input")
+        return SimpleNamespace(xyxy=[f"boxes:{image}" for image in images], names={0: "doc"})
+
+
+@pytest.fixture
+def model(monkeypatch):
+    model = FakeModel()
+
+    async def run_inline(fn, *args):
+        return fn(*args)
+
+    monkeypatch.setattr(batch_inference, "get_model", lambda name: model)
+    monkeypatch.setattr(batch_inference, "run_in_pool", run_inline)
+    return model
+
+
+def test_failed_batch_only_fails_the_bad_input(model):
+    async def run():
+        engine = BatchInferenceEngine("document", max_batch_size=2, max_wait_ms=50)
+        try:
+            return await asyncio.gather(engine.submit("good"), engine.submit("bad"), return_exceptions=True)
+        finally:
+            await engine.stop()
+
+    good, bad = asyncio.run(run())
+
+    assert good == ("boxes:good", {0: "doc"})
+    assert isinstance(bad, RuntimeError)
+    assert model.calls == [["good", "bad"], ["good"], ["bad"]]
+
+
+def test_batch_runs_as_one_forward_pass(model):
+    async def run():
+        engine = BatchInferenceEngine("document", max_batch_size=2, max_wait_ms=50)
+        try:
+            return await asyncio.gather(engine.submit("a"), engine.submit("b"))
+        finally:
+            await engine.stop()
+
+    assert asyncio.run(run()) == [("boxes:a", {0: "doc"}), ("boxes:b", {0: "doc"})]
+    assert model.calls == [["a", "b"]]
@@ -0,0 +1,38 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from utilities.image_utils import _open_reduced, decode_image
+
+
+def _jpeg(width: int, height: int) -> bytes:
+    stream = BytesIO()
+    Image.new("RGB", (width, height), (120, 80, 40)).save(stream, format="JPEG")
+    return stream.getvalue()
+
+
+@pytest.mark.parametrize("size, max_edge, expected", [
+    ((4000, 3000), 1920, (2000, 1500)),
+    ((8160, 6120), 1920, (2040, 1530)),
+    ((3000, 4000), 1280, (1500, 2000)),
+])
+def test_open_reduced_decodes_jpeg_at_reduced_scale(size, max_edge, expected):
+    img, original_edge = _open_reduced(_jpeg(*size), max_edge)
+    with img:
+        img.load()
+        assert img.size == expected
+    assert original_edge == max(size)
+
+
+def test_open_reduced_keeps_small_images():
+    img, _ = _open_reduced(_jpeg(800, 600), 1920)
+    with img:
+        img.load()
+        assert img.size == (800, 600)
+
+
+def test_decode_image_scale_maps_back_to_original():
+    array, scale = decode_image(_jpeg(4000, 3000), 1280)
+    assert max(array.shape[:2]) == 1280
+    assert scale == pytest.approx(4000 / 1280)
@@ -1,47 +1,103 @@
-import boto3
 import os
+import asyncio
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from fastapi import HTTPException
 
    # Load environment variables
 load_dotenv()
 
-   # Initialize Rekognition client using environment variables
-rekognition_client = boto3.client(
-       'rekognition',
-       region_name=os.getenv("AWS_REGION"),
-       aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-       aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY")
-   )
-
-async def run_face_comparison(source_image_path: str, target_image_path: str):
-    """Compares two faces using AWS Rekognition."""
-    
-    # Check if image files exist and are not empty
-    if not (os.path.exists(source_image_path) and os.path.getsize(source_image_path) > 0):
-        raise HTTPException(status_code=400, detail="Source image file is missing or empty")
-    if not (os.path.exists(target_image_path) and os.path.getsize(target_image_path) > 0):
-        raise HTTPException(status_code=400, detail="Target image file is missing or empty")
-    
-    with open(source_image_path, 'rb') as source_image:
-        source_bytes = source_image.read()
-    with open(target_image_path, 'rb') as target_image:
-        target_bytes = target_image.read()
-
-    if not source_bytes or not target_bytes:
-        raise HTTPException(status_code=400, detail="One or both image files are empty")
-    
+REKOGNITION_MAX_IN_FLIGHT = int(os.getenv("REKOGNITION_MAX_IN_FLIGHT", 10))  # Concurrent CompareFaces calls
+REKOGNITION_MAX_RETRIES = int(os.getenv("REKOGNITION_MAX_RETRIES", 3))       # Retries after the first attempt
+REKOGNITION_BACKOFF_BASE = float(os.getenv("REKOGNITION_BACKOFF_BASE", 0.2))  # Seconds, doubled per retry
+REKOGNITION_TIMEOUT = float(os.getenv("REKOGNITION_TIMEOUT", 10))            # Seconds per attempt
+REKOGNITION_ENDPOINT_URL = os.getenv("REKOGNITION_ENDPOINT_URL") or None     # Local stub endpoint, if any
+
+# Errors worth another attempt; anything else is returned to the caller immediately
+RETRYABLE_ERROR_CODES = {
+    "ThrottlingException",
+    "ProvisionedThroughputExceededException",
+    "InternalServerError",
+    "ServiceUnavailableException",
+}
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_rekognition_client():
+    """Return the shared Rekognition client; boto3 is imported and the client built on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import boto3
+                from botocore.config import Config
+
+                # Initialize Rekognition client using environment variables
+                _client = boto3.client(
+                    'rekognition',
+                    region_name=os.getenv("AWS_REGION"),
+                    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+                    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                    endpoint_url=REKOGNITION_ENDPOINT_URL,
+                    config=Config(
+                        max_pool_connections=REKOGNITION_MAX_IN_FLIGHT,  # Reuse one keep-alive connection per in-flight call
+                        connect_timeout=REKOGNITION_TIMEOUT,
+                        read_timeout=REKOGNITION_TIMEOUT,
+                        retries={"max_attempts": 0},  # Retries are handled below so backoff stays async
+                    ),
+                )
+    return _client
+
+
+_executor = ThreadPoolExecutor(max_workers=REKOGNITION_MAX_IN_FLIGHT, thread_name_prefix="rekognition")
+_in_flight = None
+
+
+def _is_retryable(error: Exception) -> bool:
+    from botocore.exceptions import ClientError, EndpointConnectionError, ConnectionClosedError, ConnectTimeoutError, ReadTimeoutError
+
+    if isinstance(error, ClientError):
+        return error.response.get("Error", {}).get("Code") in RETRYABLE_ERROR_CODES
+    return isinstance(error, (EndpointConnectionError, ConnectionClosedError, ConnectTimeoutError, ReadTimeoutError))
+
+
+async def _compare_faces(source_bytes: bytes, target_bytes: bytes):
+    global _in_flight
+    if _in_flight is None:
+        _in_flight = asyncio.Semaphore(REKOGNITION_MAX_IN_FLIGHT)
+
+    loop = asyncio.get_running_loop()
+    rekognition_client = await loop.run_in_executor(_executor, get_rekognition_client)
+    attempt = 0
+    async with _in_flight:
+        while True:
+            try:
+                return await loop.run_in_executor(_executor, lambda: rekognition_client.compare_faces(
+                    SourceImage={'Bytes': source_bytes},
+                    TargetImage={'Bytes': target_bytes},
+                    SimilarityThreshold=0
+                ))
+            except Exception as e:
+                if attempt >= REKOGNITION_MAX_RETRIES or not _is_retryable(e):
+                    raise
+                # Exponential backoff with full jitter
+                await asyncio.sleep(random.uniform(0, REKOGNITION_BACKOFF_BASE * (2 ** attempt)))
+                attempt += 1
+
+
+async def compare_face_bytes(source_bytes: bytes, target_bytes: bytes):
+    """Compares two in-memory face images using AWS Rekognition."""
     try:
-        response = rekognition_client.compare_faces(
-            SourceImage={'Bytes': source_bytes},
-            TargetImage={'Bytes': target_bytes},
-            SimilarityThreshold=0
-        )
+        response = await _compare_faces(source_bytes, target_bytes)
 
         face_matches = response.get('FaceMatches', [])
         unmatched_faces = response.get('UnmatchedFaces', [])
         source_bounding_box = response.get('SourceImageFace', {}).get('BoundingBox', {})
-        
+
         results = {
             "source_image_bounding_box": source_bounding_box,
             "face_matches": [],
@@ -69,4 +125,5 @@ async def run_face_comparison(source_image_path: str, target_image_path: str):
         return results
 
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Face comparison failed: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Face comparison failed: {str(e)}")
+
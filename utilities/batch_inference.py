@@ -0,0 +1,124 @@
+import os
+import asyncio
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from utilities.model_registry import get_model
+from utilities.inference_pool import run_in_pool, INFERENCE_WORKERS, INFERENCE_MAX_PENDING, INFERENCE_TIMEOUT
+
+load_dotenv()
+
+INFERENCE_MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", 8))  # Images per forward pass
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", 10))     # Max time to hold a partial batch
+
+
+class BatchInferenceEngine:
+    """Collects concurrent detection requests and runs them as one batched forward pass."""
+
+    def __init__(self, model_name: str, max_batch_size: int = INFERENCE_MAX_BATCH_SIZE,
+                 max_wait_ms: float = INFERENCE_MAX_WAIT_MS):
+        self.model_name = model_name
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self._queue = None
+        self._workers = None
+        self._worker = None
+        self._inflight = set()
+
+    async def submit(self, image):
+        """Queue an image (path or RGB array) and return its (xyxy, names) detections."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue(maxsize=INFERENCE_MAX_PENDING)
+            self._workers = asyncio.Semaphore(INFERENCE_WORKERS)
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((image, future))
+        except asyncio.QueueFull:
+            raise HTTPException(status_code=503, detail="Inference queue is full, retry later.")
+
+        try:
+            return await asyncio.wait_for(future, INFERENCE_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="Inference timed out.")
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Only start a batch once a pool worker is free, so requests pile up into it meanwhile
+            await self._workers.acquire()
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            # Keep filling the batch until it is full or the wait window closes
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Callers that gave up while queued don't need a slot in the forward pass
+            batch = [(image, future) for image, future in batch if not future.done()]
+            if batch:
+                task = asyncio.create_task(self._infer(batch))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+            else:
+                self._workers.release()
+
+    def _forward(self, images):
+        model = get_model(self.model_name)
+        return model(images)
+
+    async def _infer(self, batch):
+        try:
+            try:
+                results = await run_in_pool(self._forward, [image for image, _ in batch])
+            except Exception as e:
+                if len(batch) == 1:
+                    self._fail(batch, e)
+                    return
+                # One bad input fails the whole forward pass; rerun each image so only that caller sees the error
+                for item in batch:
+                    await self._infer_one(item)
+                return
+        finally:
+            self._workers.release()
+
+        for i, (_, future) in enumerate(batch):
+            if not future.done():
+                future.set_result((results.xyxy[i], results.names))
+
+    async def _infer_one(self, item):
+        image, future = item
+        if future.done():
+            return
+        try:
+            results = await run_in_pool(self._forward, [image])
+        except Exception as e:
+            self._fail([item], e)
+            return
+        if not future.done():
+            future.set_result((results.xyxy[0], results.names))
+
+    @staticmethod
+    def _fail(batch, error):
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+
+# Shared engine for the front and back document routers
+document_detector = BatchInferenceEngine("document")
@@ -1,8 +1,7 @@
 import os
+import threading
 from datetime import datetime
 from dotenv import load_dotenv
-from minio import Minio
-from minio.error import S3Error
 from io import BytesIO
 from utilities.logger import logger
 from PIL import Image, ImageDraw
@@ -18,26 +17,70 @@ MINIO_USER = os.getenv("MINIO_USER")
 MINIO_PASS = os.getenv("MINIO_PASS")
 MINIO_BUCKET = os.getenv("MINIO_BUCKET")
 
-# MinIO Client with HTTPS
-client = Minio(
-    MINIO_URL.replace("https://", "").replace("http://", ""),  # Remove protocol for MinIO client
-    access_key=MINIO_USER,
-    secret_key=MINIO_PASS,
-    secure=MINIO_URL.startswith("https"),  # True for HTTPS
-)
+MINIO_POOL_MAXSIZE = int(os.getenv("MINIO_POOL_MAXSIZE", 20))          # Keep-alive connections to MinIO
+MINIO_CONNECT_TIMEOUT = float(os.getenv("MINIO_CONNECT_TIMEOUT", 5))   # Seconds
+MINIO_READ_TIMEOUT = float(os.getenv("MINIO_READ_TIMEOUT", 30))        # Seconds
+MINIO_RETRIES = int(os.getenv("MINIO_RETRIES", 3))
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _build_minio_client():
+    import certifi
+    import urllib3
+    from minio import Minio
+
+    # Shared HTTP connection pool for the MinIO client
+    minio_http_client = urllib3.PoolManager(
+        timeout=urllib3.Timeout(connect=MINIO_CONNECT_TIMEOUT, read=MINIO_READ_TIMEOUT),
+        maxsize=MINIO_POOL_MAXSIZE,
+        block=False,
+        cert_reqs="CERT_REQUIRED",
+        ca_certs=certifi.where(),
+        retries=urllib3.Retry(
+            total=MINIO_RETRIES,
+            backoff_factor=0.2,
+            status_forcelist=[500, 502, 503, 504],
+        ),
+    )
+
+    # MinIO Client with HTTPS
+    return Minio(
+        MINIO_URL.replace("https://", "").replace("http://", ""),  # Remove protocol for MinIO client
+        access_key=MINIO_USER,
+        secret_key=MINIO_PASS,
+        secure=MINIO_URL.startswith("https"),  # True for HTTPS
+        http_client=minio_http_client,
+    )
+
+
+def get_minio_client():
+    """Return the shared MinIO client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _build_minio_client()
+    return _client
+
+def get_minio_day_prefix(when) -> str:
+    """MinIO prefix holding every image saved on the given date or datetime."""
+    year = when.strftime("%Y")
+    month = when.strftime("%B")
+    day = when.strftime("%D").replace("/", "-")  # MinIO doesn't support "/" in object names
+
+    return os.path.join(Photo_Root, year, month, day, "").replace("\\", "/")
 
 def get_image_save_path_minio(msisdn: int, session_id: str, suffix: str):
     """Generate the remote path for storing the image in MinIO."""
-    now = datetime.now()
-    year = now.strftime("%Y")
-    month = now.strftime("%B")
-    day = now.strftime("%D").replace("/", "-")  # MinIO doesn't support "/" in object names
-
     file_name = f"{msisdn}_{session_id}_{suffix}.jpg"
-    return os.path.join(Photo_Root, year, month, day, file_name).replace("\\", "/")
+    return get_minio_day_prefix(datetime.now()) + file_name
 
 def upload_to_minio(msisdn: int, suffix: str):
     """Create a file structure in MinIO and upload content."""
+    from minio.error import S3Error
+    client = get_minio_client()
     try:
         # Ensure bucket exists
         if not client.bucket_exists(MINIO_BUCKET):
@@ -72,6 +115,8 @@ def upload_to_minio(msisdn: int, suffix: str):
 
 def download_from_minio(object_name: str, download_path: str):
     """Download file from MinIO to the local path."""
+    from minio.error import S3Error
+    client = get_minio_client()
     try:
         # Download the object from MinIO
         client.fget_object(MINIO_BUCKET, object_name, download_path)
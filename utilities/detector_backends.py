@@ -0,0 +1,197 @@
+import os
+import ast
+import json
+import time
+from abc import ABC, abstractmethod
+import numpy as np
+from PIL import Image, ImageOps
+from types import SimpleNamespace
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DETECTOR_IMAGE_SIZE = int(os.getenv("DETECTOR_IMAGE_SIZE", 640))         # Square input edge the graph was exported with
+DETECTOR_CONF_THRESHOLD = float(os.getenv("DETECTOR_CONF_THRESHOLD", 0.25))  # Same defaults as YOLOv5 AutoShape
+DETECTOR_IOU_THRESHOLD = float(os.getenv("DETECTOR_IOU_THRESHOLD", 0.45))
+DETECTOR_MAX_DET = int(os.getenv("DETECTOR_MAX_DET", 1000))
+DETECTOR_THREADS = int(os.getenv("DETECTOR_THREADS", 0))                 # Intra-op threads; 0 lets the runtime decide
+
+
+def letterbox(image: np.ndarray, size: int = DETECTOR_IMAGE_SIZE):
+    """Resize keeping aspect ratio and pad to a size x size square, as YOLOv5 does before the forward pass."""
+    h, w = image.shape[:2]
+    ratio = min(size / h, size / w)
+    new_w, new_h = round(w * ratio), round(h * ratio)
+    if (new_w, new_h) != (w, h):
+        image = np.asarray(Image.fromarray(image).resize((new_w, new_h), Image.Resampling.BILINEAR))
+    pad_x, pad_y = (size - new_w) / 2, (size - new_h) / 2
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    top, left = int(round(pad_y - 0.1)), int(round(pad_x - 0.1))
+    canvas[top:top + new_h, left:left + new_w] = image
+    return canvas, ratio, (left, top)
+
+
+def _box_iou(box, boxes):
+    x1 = np.maximum(box[0], boxes[:, 0])
+    y1 = np.maximum(box[1], boxes[:, 1])
+    x2 = np.minimum(box[2], boxes[:, 2])
+    y2 = np.minimum(box[3], boxes[:, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return inter / (area + areas - inter + 1e-9)
+
+
+def non_max_suppression(prediction: np.ndarray, conf_thres: float = DETECTOR_CONF_THRESHOLD,
+                        iou_thres: float = DETECTOR_IOU_THRESHOLD, max_det: int = DETECTOR_MAX_DET):
+    """Per-class NMS over raw YOLOv5 rows (cx, cy, w, h, obj, cls...); returns (n, 6) xyxy/conf/cls sorted by conf."""
+    prediction = prediction[prediction[:, 4] > conf_thres]
+    if not len(prediction):
+        return np.zeros((0, 6), dtype=np.float32)
+
+    scores = prediction[:, 5:] * prediction[:, 4:5]
+    cls = scores.argmax(1)
+    conf = scores[np.arange(len(scores)), cls]
+    keep = conf > conf_thres
+    prediction, cls, conf = prediction[keep], cls[keep], conf[keep]
+
+    boxes = np.empty((len(prediction), 4), dtype=np.float32)
+    boxes[:, 0] = prediction[:, 0] - prediction[:, 2] / 2
+    boxes[:, 1] = prediction[:, 1] - prediction[:, 3] / 2
+    boxes[:, 2] = prediction[:, 0] + prediction[:, 2] / 2
+    boxes[:, 3] = prediction[:, 1] + prediction[:, 3] / 2
+
+    # Offsetting boxes by class keeps different classes from suppressing each other
+    offset = boxes + cls[:, None] * 7680
+    order = conf.argsort()[::-1]
+    selected = []
+    while len(order) and len(selected) < max_det:
+        best, order = order[0], order[1:]
+        selected.append(best)
+        if len(order):
+            order = order[_box_iou(offset[best], offset[order]) <= iou_thres]
+
+    return np.concatenate([boxes[selected], conf[selected, None], cls[selected, None]], axis=1).astype(np.float32)
+
+
+def _class_names(names):
+    # Older YOLOv5 checkpoints store names as a list, newer ones as {index: name}
+    if isinstance(names, (list, tuple)):
+        return dict(enumerate(names))
+    return {int(k): v for k, v in names.items()}
+
+
+def _as_rgb(image):
+    if isinstance(image, (str, os.PathLike)):
+        with Image.open(image) as img:
+            return np.asarray(ImageOps.exif_transpose(img).convert("RGB"))
+    return image
+
+
+class ExportedDetector(ABC):
+    """Callable with the subset of the YOLOv5 AutoShape interface the routers use: results.xyxy and results.names."""
+
+    def __init__(self, path, size: int = DETECTOR_IMAGE_SIZE):
+        self.path = str(path)
+        self.size = size
+        self.names = {}
+
+    @abstractmethod
+    def _forward(self, batch: np.ndarray) -> np.ndarray:
+        """Run the exported graph on an NCHW float batch and return its raw (n, rows, 5 + classes) output."""
+
+    def __call__(self, images, size=None):
+        if size is not None and size != self.size:
+            # The graph's input shape is fixed at export time; re-export to run at another size
+            raise ValueError(f"{type(self).__name__} was exported at size {self.size}, not {size}")
+        images = [_as_rgb(image) for image in (images if isinstance(images, list) else [images])]
+
+        start = time.perf_counter()
+        padded, ratios, pads = [], [], []
+        for image in images:
+            canvas, ratio, pad = letterbox(image, self.size)
+            padded.append(canvas)
+            ratios.append(ratio)
+            pads.append(pad)
+        batch = np.ascontiguousarray(np.stack(padded).transpose(0, 3, 1, 2), dtype=np.float32) / 255.0
+        preprocessed = time.perf_counter()
+
+        prediction = self._forward(batch)
+        inferred = time.perf_counter()
+
+        xyxy = []
+        for i, (ratio, (left, top)) in enumerate(zip(ratios, pads)):
+            detections = non_max_suppression(prediction[i])
+            # Map boxes from the letterboxed square back to the caller's image
+            detections[:, [0, 2]] = ((detections[:, [0, 2]] - left) / ratio).clip(0, images[i].shape[1])
+            detections[:, [1, 3]] = ((detections[:, [1, 3]] - top) / ratio).clip(0, images[i].shape[0])
+            xyxy.append(detections)
+        finished = time.perf_counter()
+
+        count = len(images)
+        return SimpleNamespace(
+            xyxy=xyxy,
+            names=self.names,
+            # (preprocess, inference, NMS) ms per image, matching the YOLOv5 results attribute
+            t=tuple(1000 * seconds / count for seconds in (preprocessed - start, inferred - preprocessed, finished - inferred)),
+        )
+
+
+class OnnxDetector(ExportedDetector):
+    """YOLOv5 graph exported to ONNX, run with ONNX Runtime on CPU."""
+
+    def __init__(self, path, size: int = DETECTOR_IMAGE_SIZE):
+        super().__init__(path, size)
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        if DETECTOR_THREADS:
+            options.intra_op_num_threads = DETECTOR_THREADS
+        self.session = ort.InferenceSession(self.path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+        # Class names are written into the graph metadata by YOLOv5's export
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        if "names" in metadata:
+            self.names = _class_names(ast.literal_eval(metadata["names"]))
+        batch_dim = self.session.get_inputs()[0].shape[0]
+        self.dynamic_batch = not isinstance(batch_dim, int)
+
+    def _forward(self, batch):
+        if self.dynamic_batch:
+            return self.session.run(None, {self.input_name: batch})[0]
+        # Graphs exported without --dynamic only take one image at a time
+        return np.concatenate([self.session.run(None, {self.input_name: batch[i:i + 1]})[0] for i in range(len(batch))])
+
+
+class TorchScriptDetector(ExportedDetector):
+    """YOLOv5 graph exported to TorchScript, frozen and optimised for CPU inference."""
+
+    def __init__(self, path, size: int = DETECTOR_IMAGE_SIZE):
+        super().__init__(path, size)
+        import torch
+
+        if DETECTOR_THREADS:
+            torch.set_num_threads(DETECTOR_THREADS)
+        extra_files = {"config.txt": ""}
+        model = torch.jit.load(self.path, map_location="cpu", _extra_files=extra_files)
+        self.model = torch.jit.optimize_for_inference(torch.jit.freeze(model.eval()))
+        if extra_files["config.txt"]:
+            self.names = _class_names(json.loads(extra_files["config.txt"]).get("names", {}))
+        self._torch = torch
+
+    def _forward(self, batch):
+        torch = self._torch
+        with torch.inference_mode():
+            # Traced graphs are specialised to the export batch size of 1
+            outputs = [self.model(torch.from_numpy(batch[i:i + 1])) for i in range(len(batch))]
+        return np.concatenate([(out[0] if isinstance(out, (list, tuple)) else out).numpy() for out in outputs])
+
+
+DETECTOR_BACKENDS = {
+    "onnx": (OnnxDetector, ".onnx"),
+    "onnx-int8": (OnnxDetector, ".int8.onnx"),  # Written by scripts/quantize_detector.py
+    "torchscript": (TorchScriptDetector, ".torchscript"),
+}
@@ -0,0 +1,74 @@
+import os
+import asyncio
+import tempfile
+from dotenv import load_dotenv
+from utilities.logger import logger
+from utilities import storage
+from utilities.image_utils import decode_image
+from utilities.batch_inference import document_detector
+from utilities.metrics import stage
+
+load_dotenv()
+
+# Decode the upload in memory and store it in MinIO alongside inference,
+# instead of the temp-file -> MinIO -> temp-file round trip
+DETECTION_IN_MEMORY = os.getenv("DETECTION_IN_MEMORY", "true").lower() == "true"
+
+
+async def detect_uploaded_document(file_content: bytes, object_name: str):
+    """Store the uploaded document in MinIO and return its (xyxy, names) detections."""
+    if DETECTION_IN_MEMORY:
+        return await _detect_in_memory(file_content, object_name)
+    return await _detect_via_minio(file_content, object_name)
+
+
+async def _detect_in_memory(file_content: bytes, object_name: str):
+    async def upload():
+        with stage("minio_put"):
+            await storage.put_object(object_name, file_content)
+        logger.info(f"File successfully uploaded to MinIO at: {object_name}")
+
+    async def detect():
+        with stage("decode"):
+            image, scale = await asyncio.to_thread(decode_image, file_content)
+        with stage("inference"):
+            xyxy, names = await document_detector.submit(image)
+
+        # Boxes come back in downscaled pixels; report them against the original upload
+        if scale != 1.0 and len(xyxy):
+            xyxy = xyxy.clone() if hasattr(xyxy, "clone") else xyxy.copy()
+            xyxy[:, :4] *= scale
+        return xyxy, names
+
+    detections, _ = await asyncio.gather(detect(), upload())
+    return detections
+
+
+async def _detect_via_minio(file_content: bytes, object_name: str):
+    # Save the uploaded file directly to MinIO
+    with stage("temp_file_io"), tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp_file:
+        upload_filename = tmp_file.name
+        tmp_file.write(file_content)
+
+    try:
+        # Upload to MinIO using the MinIO client and the correct path
+        with stage("minio_put"):
+            await storage.fput_object(object_name, upload_filename)
+        logger.info(f"File successfully uploaded to MinIO at: {object_name}")
+    finally:
+        os.remove(upload_filename)
+
+    # Retrieve the image from MinIO for inference into a temporary file
+    with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp_file:
+        tmp_filename = tmp_file.name
+    with stage("minio_get"):
+        await storage.fget_object(object_name, tmp_filename)
+
+    logger.info(f"Image successfully retrieved from MinIO: {object_name}")
+
+    try:
+        # Run inference with YOLOv5 by passing the retrieved image file path
+        with stage("inference"):
+            return await document_detector.submit(tmp_filename)
+    finally:
+        os.remove(tmp_filename)
@@ -0,0 +1,226 @@
+import os
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from utilities import face_compare_cache
+from utilities.image_utils import normalize_image
+
+load_dotenv()
+
+FACE_COMPARE_BACKEND = os.getenv("FACE_COMPARE_BACKEND", "rekognition")  # "rekognition" or "local"
+
+# Local backend: OpenCV YuNet face detector + SFace embedding model (ONNX files from the OpenCV model zoo)
+LOCAL_FACE_DETECTOR_MODEL = os.getenv("LOCAL_FACE_DETECTOR_MODEL", "models/face_detection_yunet_2023mar.onnx")
+LOCAL_FACE_RECOGNIZER_MODEL = os.getenv("LOCAL_FACE_RECOGNIZER_MODEL", "models/face_recognition_sface_2021dec.onnx")
+LOCAL_FACE_SCORE_THRESHOLD = float(os.getenv("LOCAL_FACE_SCORE_THRESHOLD", 0.6))  # Minimum detector score
+LOCAL_FACE_WORKERS = int(os.getenv("LOCAL_FACE_WORKERS", 2))                      # Threads running the models
+LOCAL_FACE_MATCH_THRESHOLD = float(os.getenv("LOCAL_FACE_MATCH_THRESHOLD", 0.363))  # SFace cosine for a match
+
+# Similarity (0-100) at which SP_INSERT_FACECOMPARE passes a face. SFace's match threshold is mapped onto it;
+# until it is set, local results are not written through the stored procedure.
+_decision_similarity = os.getenv("LOCAL_FACE_DECISION_SIMILARITY")
+LOCAL_FACE_DECISION_SIMILARITY = float(_decision_similarity) if _decision_similarity else None
+
+
+class FaceCompareBackend(ABC):
+    """Compares the largest face in a source image against every face in a target image."""
+
+    name = None
+    # Whether similarity is on the scale SP_INSERT_FACECOMPARE's pass/fail threshold assumes
+    calibrated = True
+
+    @abstractmethod
+    async def compare(self, source_bytes: bytes, target_bytes: bytes, target_features: dict = None) -> dict:
+        """Return source_image_bounding_box, face_matches and unmatched_faces in Rekognition's layout.
+
+        target_features holds a precomputed face and embedding for the target (see liveness_features);
+        backends that can't use embeddings compare against target_bytes as usual.
+        """
+
+    def warm_up(self):
+        """Import dependencies and build clients or models ahead of the first request (called from a thread)."""
+
+
+class RekognitionBackend(FaceCompareBackend):
+    name = "rekognition"
+
+    def warm_up(self):
+        from utilities.aws_rekognition import get_rekognition_client
+        get_rekognition_client()
+
+    async def compare(self, source_bytes: bytes, target_bytes: bytes, target_features: dict = None) -> dict:
+        # Imported here so deployments on the local backend never build a boto3 client
+        from utilities.aws_rekognition import compare_face_bytes
+        return await compare_face_bytes(source_bytes, target_bytes)
+
+
+class LocalFaceBackend(FaceCompareBackend):
+    """CPU face detection and embedding with cosine similarity, no network calls."""
+
+    name = "local"
+    calibrated = LOCAL_FACE_DECISION_SIMILARITY is not None
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=LOCAL_FACE_WORKERS, thread_name_prefix="local-face")
+        self._models = threading.local()  # OpenCV DNN models are not safe to share across threads
+
+    def _get_models(self):
+        import cv2
+        if not hasattr(self._models, "detector"):
+            self._models.detector = cv2.FaceDetectorYN.create(
+                LOCAL_FACE_DETECTOR_MODEL, "", (320, 320), LOCAL_FACE_SCORE_THRESHOLD
+            )
+            self._models.recognizer = cv2.FaceRecognizerSF.create(LOCAL_FACE_RECOGNIZER_MODEL, "")
+        return self._models.detector, self._models.recognizer
+
+    def warm_up(self):
+        self._executor.submit(self._get_models).result()
+
+    def analyse(self, image_bytes: bytes):
+        """Detect faces and embed each one; returns (image size, [(face row, unit embedding)])."""
+        import cv2
+        import numpy as np
+
+        image = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            raise HTTPException(status_code=400, detail="Image could not be decoded")
+
+        detector, recognizer = self._get_models()
+        height, width = image.shape[:2]
+        detector.setInputSize((width, height))
+        _, faces = detector.detect(image)
+        if faces is None:
+            return (width, height), []
+
+        analysed = []
+        for face in faces:
+            embedding = recognizer.feature(recognizer.alignCrop(image, face)).flatten()
+            analysed.append((face, embedding / np.linalg.norm(embedding)))
+        return (width, height), analysed
+
+    @staticmethod
+    def _bounding_box(face, size):
+        width, height = size
+        x, y, w, h = (float(v) for v in face[:4])
+        return {
+            "Width": w / width,
+            "Height": h / height,
+            "Left": x / width,
+            "Top": y / height,
+        }
+
+    @staticmethod
+    def _similarity(cosine: float) -> float:
+        """Map SFace cosine onto 0-100 so that LOCAL_FACE_MATCH_THRESHOLD lands on LOCAL_FACE_DECISION_SIMILARITY."""
+        cosine = min(max(cosine, 0.0), 1.0)
+        if LOCAL_FACE_DECISION_SIMILARITY is None:
+            return cosine * 100  # Uncalibrated; only meaningful relative to other local scores
+        threshold, decision = LOCAL_FACE_MATCH_THRESHOLD, LOCAL_FACE_DECISION_SIMILARITY
+        if cosine <= threshold:
+            return cosine / threshold * decision
+        return decision + (cosine - threshold) / (1 - threshold) * (100 - decision)
+
+    def _compare(self, source_bytes: bytes, target_bytes: bytes, target_features: dict = None) -> dict:
+        source_size, source_faces = self.analyse(source_bytes)
+        if not source_faces:
+            raise HTTPException(status_code=500, detail="Face comparison failed: no face detected in source image")
+
+        if target_features is not None:
+            target_size = tuple(target_features["size"])
+            target_faces = [(target_features["face"], target_features["embedding"])]
+        else:
+            target_size, target_faces = self.analyse(target_bytes)
+
+        # Rekognition compares the largest face in the source image
+        source_face, source_embedding = max(source_faces, key=lambda f: f[0][2] * f[0][3])
+
+        face_matches = []
+        for face, embedding in target_faces:
+            cosine = float(source_embedding @ embedding)
+            box = self._bounding_box(face, target_size)
+            face_matches.append({
+                "similarity": self._similarity(cosine),
+                "confidence": float(face[-1]) * 100,
+                "bounding_box": {
+                    "width": box["Width"],
+                    "height": box["Height"],
+                    "left": box["Left"],
+                    "top": box["Top"],
+                },
+            })
+        face_matches.sort(key=lambda match: match["similarity"], reverse=True)
+
+        return {
+            "source_image_bounding_box": self._bounding_box(source_face, source_size),
+            "face_matches": face_matches,
+            "unmatched_faces": [],
+        }
+
+    async def compare(self, source_bytes: bytes, target_bytes: bytes, target_features: dict = None) -> dict:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._compare, source_bytes, target_bytes, target_features)
+
+    async def run(self, fn, *args):
+        """Run a blocking call on this backend's model threads."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+
+FACE_COMPARE_BACKENDS = {
+    RekognitionBackend.name: RekognitionBackend,
+    LocalFaceBackend.name: LocalFaceBackend,
+}
+
+_backend = None
+
+
+def register_backend(name: str, backend_cls):
+    """Make an extra backend selectable through FACE_COMPARE_BACKEND."""
+    FACE_COMPARE_BACKENDS[name] = backend_cls
+
+
+def get_face_backend() -> FaceCompareBackend:
+    global _backend
+    if _backend is None:
+        if FACE_COMPARE_BACKEND not in FACE_COMPARE_BACKENDS:
+            raise ValueError(f"Unknown FACE_COMPARE_BACKEND: {FACE_COMPARE_BACKEND}")
+        _backend = FACE_COMPARE_BACKENDS[FACE_COMPARE_BACKEND]()
+    return _backend
+
+
+async def compare_face_bytes(source_bytes: bytes, target_bytes: bytes, target_features: dict = None) -> dict:
+    """Compare two in-memory images on the configured backend, reusing cached results for identical pairs."""
+    if not source_bytes or not target_bytes:
+        raise HTTPException(status_code=400, detail="One or both image files are empty")
+
+    backend = get_face_backend()
+
+    async def compare():
+        # Full-resolution camera photos are downscaled before they reach the backend
+        source, target = await asyncio.gather(
+            asyncio.to_thread(normalize_image, source_bytes),
+            asyncio.to_thread(normalize_image, target_bytes),
+        )
+        return await backend.compare(source, target, target_features=target_features)
+
+    return await face_compare_cache.get_or_compute(backend.name, source_bytes, target_bytes, compare)
+
+
+async def run_face_comparison(source_image_path: str, target_image_path: str):
+    """Compares two faces using the configured face comparison backend."""
+
+    # Check if image files exist and are not empty
+    if not (os.path.exists(source_image_path) and os.path.getsize(source_image_path) > 0):
+        raise HTTPException(status_code=400, detail="Source image file is missing or empty")
+    if not (os.path.exists(target_image_path) and os.path.getsize(target_image_path) > 0):
+        raise HTTPException(status_code=400, detail="Target image file is missing or empty")
+
+    with open(source_image_path, 'rb') as source_image:
+        source_bytes = source_image.read()
+    with open(target_image_path, 'rb') as target_image:
+        target_bytes = target_image.read()
+
+    return await compare_face_bytes(source_bytes, target_bytes)
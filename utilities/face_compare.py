@@ -1,18 +1,21 @@
 from fastapi import APIRouter, UploadFile, HTTPException, File, Form
 from schema.schemas import FaceComparisonResponse, FaceComparisonResult
-from utilities.aws_rekognition import run_face_comparison
+from utilities.face_backends import compare_face_bytes, get_face_backend
+from utilities.liveness_features import load_liveness_features
+from utilities.metrics import stage
 from utilities.logger import logger
-import os
-import shutil
+from utilities.tracing import traced
 import json
+import asyncio
 from database import dbconfig
 from utilities.image_cropper import image_cropper
-from utilities.config import get_image_save_path_minio, MINIO_BUCKET, download_from_minio, client
-from tempfile import NamedTemporaryFile
+from utilities.config import get_image_save_path_minio
+from utilities import storage, image_cache
 
 router = APIRouter()
 
 @router.post("/face/compare", response_model=FaceComparisonResponse)
+@traced("face_compare_auto")
 async def face_compare_auto(
     document_front: str = Form(...), 
     liveness_document: str = Form(...), 
@@ -21,18 +24,31 @@ async def face_compare_auto(
     msisdn: int = Form(...)
 ):
     logger.info("Face comparison inference started.")
+
+    backend = get_face_backend()
+    if not backend.calibrated:
+        # SP_INSERT_FACECOMPARE's threshold assumes Rekognition's similarity scale
+        logger.error(f"Face backend '{backend.name}' is not calibrated; refusing to record a decision")
+        raise HTTPException(status_code=503, detail="Face comparison backend is not calibrated; set LOCAL_FACE_DECISION_SIMILARITY")
     
     try:
-        # Create temporary files to store the images
-        document_front_local_path = NamedTemporaryFile(delete=False, suffix=".jpg").name
-        liveness_document_local_path = NamedTemporaryFile(delete=False, suffix=".jpg").name
-
-        # Download images from MinIO to temporary files
-        download_from_minio(document_front, document_front_local_path)
-        download_from_minio(liveness_document, liveness_document_local_path)
-
-        # Run face comparison with the downloaded images
-        result = await run_face_comparison(document_front_local_path, liveness_document_local_path)
+        # Both images are fetched concurrently straight into memory, unless this worker still holds them
+        with stage("face_compare.minio_get"):
+            document_front_bytes, (liveness_features, liveness_bytes) = await asyncio.gather(
+                image_cache.fetch(document_front),
+                _fetch_liveness(liveness_document),
+            )
+        if not document_front_bytes:
+            raise HTTPException(status_code=400, detail="Source image file is missing or empty")
+
+        with stage("face_compare.backend"):
+            if liveness_features is not None:
+                # Liveness face was already cropped and embedded at upload time; only the document needs analysis
+                result = await compare_face_bytes(
+                    document_front_bytes, liveness_features["face_image"], target_features=liveness_features
+                )
+            else:
+                result = await compare_face_bytes(document_front_bytes, liveness_bytes)
         source_image_details = result.get("source_image_bounding_box")
 
         cropped_image_path = None
@@ -41,17 +57,13 @@ async def face_compare_auto(
             cropped_image_path = get_image_save_path_minio(msisdn, session_id, "cropped_image")
             
             # Perform image cropping and get the cropped image as a byte stream
-            cropped_image_stream = image_cropper(document_front_local_path, source_image_details)
+            with stage("face_compare.crop"):
+                cropped_image_stream = await asyncio.to_thread(image_cropper, document_front_bytes, source_image_details)
 
             if cropped_image_stream:
                 # Upload cropped image directly to MinIO
-                client.put_object(
-                    bucket_name=MINIO_BUCKET,
-                    object_name=cropped_image_path,
-                    data=cropped_image_stream,
-                    length=len(cropped_image_stream.getvalue()),
-                    content_type="image/jpeg"
-                )
+                with stage("face_compare.minio_put"):
+                    await storage.put_object(cropped_image_path, cropped_image_stream.getvalue())
                 logger.info(f"Cropped image uploaded to MinIO at: {cropped_image_path}")
             else:
                 logger.error("Error while cropping the image.")
@@ -73,15 +85,16 @@ async def face_compare_auto(
             }
 
         # Insert face comparison result into the database
-        fc_status_decoded = await insert_face_compare_result(
-            session_id=session_id,
-            csid=csid,
-            Cropped_img_path=cropped_image_path,
-            confidence=confidence / 100,
-            similarity=similarity / 100,
-            details=details,
-            msisdn=msisdn,
-        )
+        with stage("sp_insert_facecompare"):
+            fc_status_decoded = await insert_face_compare_result(
+                session_id=session_id,
+                csid=csid,
+                Cropped_img_path=cropped_image_path,
+                confidence=confidence / 100,
+                similarity=similarity / 100,
+                details=details,
+                msisdn=msisdn,
+            )
 
         # Prepare the response payload
         if fc_status_decoded == 1:
@@ -110,11 +123,24 @@ async def face_compare_auto(
         logger.info("Face comparison completed.")
         return payload
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error during face comparison: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _fetch_liveness(liveness_document: str):
+    """Precomputed liveness features when available, otherwise the raw liveness image bytes."""
+    liveness_features = await load_liveness_features(liveness_document)
+    if liveness_features is not None:
+        return liveness_features, None
+    liveness_bytes = await image_cache.fetch(liveness_document)
+    if not liveness_bytes:
+        raise HTTPException(status_code=400, detail="Target image file is missing or empty")
+    return None, liveness_bytes
+
+
 async def insert_face_compare_result(session_id, csid, similarity, confidence, details, msisdn, Cropped_img_path):
     sp_query = "CALL SP_INSERT_FACECOMPARE(%s, %s, %s, %s, %s, %s, %s)"
     async with dbconfig.db_pool.acquire() as conn:
@@ -0,0 +1,162 @@
+import os
+import time
+import json
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+FACE_COMPARE_CACHE_BACKEND = os.getenv("FACE_COMPARE_CACHE_BACKEND", "memory")  # "memory", "sqlite" or "none"
+FACE_COMPARE_CACHE_TTL = float(os.getenv("FACE_COMPARE_CACHE_TTL", 3600))        # Seconds
+FACE_COMPARE_CACHE_MAX_ENTRIES = int(os.getenv("FACE_COMPARE_CACHE_MAX_ENTRIES", 1024))
+FACE_COMPARE_CACHE_PATH = os.getenv("FACE_COMPARE_CACHE_PATH", "face_compare_cache.sqlite3")  # sqlite backend only
+
+
+class MemoryCacheBackend:
+    """Per-process LRU with TTL; the fastest option, but not shared between workers."""
+
+    blocking = False
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: dict):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SqliteCacheBackend:
+    """LRU with TTL in a local SQLite file, shared by every worker on the host."""
+
+    blocking = True
+
+    def __init__(self, path: str, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS face_compare_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_face_compare_cache_last_access ON face_compare_cache (last_access)"
+        )
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM face_compare_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM face_compare_cache WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE face_compare_cache SET last_access = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: dict):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO face_compare_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + self.ttl, now),
+            )
+            self._conn.execute("DELETE FROM face_compare_cache WHERE expires_at < ?", (now,))
+            self._conn.execute(
+                "DELETE FROM face_compare_cache WHERE key IN ("
+                "SELECT key FROM face_compare_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+
+def _create_backend():
+    if FACE_COMPARE_CACHE_BACKEND == "memory":
+        return MemoryCacheBackend(FACE_COMPARE_CACHE_MAX_ENTRIES, FACE_COMPARE_CACHE_TTL)
+    if FACE_COMPARE_CACHE_BACKEND == "sqlite":
+        return SqliteCacheBackend(FACE_COMPARE_CACHE_PATH, FACE_COMPARE_CACHE_MAX_ENTRIES, FACE_COMPARE_CACHE_TTL)
+    if FACE_COMPARE_CACHE_BACKEND == "none":
+        return None
+    raise ValueError(f"Unknown FACE_COMPARE_CACHE_BACKEND: {FACE_COMPARE_CACHE_BACKEND}")
+
+
+# Created on first use rather than at import: a SQLite connection opened in the pre-fork parent
+# would be shared by every worker, which SQLite does not support
+_backend = None
+_backend_created = False
+_stats = {"hits": 0, "misses": 0}
+
+
+def make_key(namespace: str, source_bytes: bytes, target_bytes: bytes) -> str:
+    """Content hash of an ordered (source, target) image pair, scoped to the backend that compared them."""
+    return f"{namespace}:{hashlib.sha256(source_bytes).hexdigest()}:{hashlib.sha256(target_bytes).hexdigest()}"
+
+
+def get_backend():
+    global _backend, _backend_created
+    if not _backend_created:
+        _backend = _create_backend()
+        _backend_created = True
+    return _backend
+
+
+async def _call(backend, fn, *args):
+    if backend.blocking:
+        return await asyncio.to_thread(fn, *args)
+    return fn(*args)
+
+
+async def get_or_compute(namespace: str, source_bytes: bytes, target_bytes: bytes, compute):
+    """Return the cached comparison for this image pair, or await compute() and cache it."""
+    backend = get_backend()
+    if backend is None:
+        return await compute()
+
+    key = make_key(namespace, source_bytes, target_bytes)
+    cached = await _call(backend, backend.get, key)
+    if cached is not None:
+        _stats["hits"] += 1
+        return cached
+
+    _stats["misses"] += 1
+    result = await compute()
+    await _call(backend, backend.set, key, result)
+    return result
+
+
+def get_cache_stats():
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        "backend": FACE_COMPARE_CACHE_BACKEND,
+        **_stats,
+        "hit_ratio": _stats["hits"] / lookups if lookups else 0.0,
+    }
@@ -0,0 +1,342 @@
+import os
+import json
+import time
+import uuid
+import socket
+import asyncio
+import sqlite3
+import threading
+import psutil
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from utilities.logger import logger
+from utilities.tracing import span
+
+load_dotenv()
+
+FACE_COMPARE_MODE = os.getenv("FACE_COMPARE_MODE", "background")               # "background" or "inline"
+FACE_COMPARE_JOBS_PATH = os.getenv("FACE_COMPARE_JOBS_PATH", "face_compare_jobs.sqlite3")
+FACE_COMPARE_JOB_WORKERS = int(os.getenv("FACE_COMPARE_JOB_WORKERS", 4))        # Jobs run concurrently per process
+FACE_COMPARE_JOB_MAX_ATTEMPTS = int(os.getenv("FACE_COMPARE_JOB_MAX_ATTEMPTS", 3))
+FACE_COMPARE_JOB_RETRY_DELAY = float(os.getenv("FACE_COMPARE_JOB_RETRY_DELAY", 5))  # Seconds, doubled per attempt
+FACE_COMPARE_JOB_POLL_INTERVAL = float(os.getenv("FACE_COMPARE_JOB_POLL_INTERVAL", 1))  # Seconds between idle polls
+FACE_COMPARE_JOB_RETENTION = float(os.getenv("FACE_COMPARE_JOB_RETENTION", 7 * 24 * 3600))  # Seconds finished jobs are kept
+FACE_COMPARE_JOB_SHUTDOWN_GRACE = float(os.getenv("FACE_COMPARE_JOB_SHUTDOWN_GRACE", 10))  # Seconds to finish running jobs
+FACE_COMPARE_JOB_STORE_BACKOFF = float(os.getenv("FACE_COMPARE_JOB_STORE_BACKOFF", 5))  # Seconds to wait after a store error
+
+# Identifies this process as the owner of the jobs it claims, so a restart can tell orphaned jobs apart
+_HOST = socket.gethostname()
+
+_COLUMNS = (
+    "id", "status", "msisdn", "session_id", "csid", "document_front", "liveness_document",
+    "attempts", "result", "error", "created_at", "updated_at",
+)
+
+
+class JobStore:
+    """Durable face-compare queue in a local SQLite file, shared by every worker process on the host."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS face_compare_jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, msisdn INTEGER NOT NULL, session_id TEXT NOT NULL, "
+            "csid TEXT NOT NULL, document_front TEXT NOT NULL, liveness_document TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, result TEXT, error TEXT, owner TEXT, "
+            "available_at REAL NOT NULL, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_face_compare_jobs_queue ON face_compare_jobs (status, available_at)"
+        )
+
+    def enqueue(self, job_id: str, msisdn: int, session_id: str, csid: str, document_front: str, liveness_document: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO face_compare_jobs (id, status, msisdn, session_id, csid, document_front, "
+                "liveness_document, available_at, created_at, updated_at) VALUES (?, 'queued', ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, msisdn, session_id, csid, document_front, liveness_document, now, now, now),
+            )
+
+    def claim(self, owner: str):
+        """Atomically move the oldest runnable job to 'running' and return it, or None."""
+        now = time.time()
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so two processes can't claim the same row
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    f"SELECT {', '.join(_COLUMNS)} FROM face_compare_jobs "
+                    "WHERE status = 'queued' AND available_at <= ? ORDER BY available_at LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE face_compare_jobs SET status = 'running', attempts = attempts + 1, owner = ?, "
+                        "updated_at = ? WHERE id = ?",
+                        (owner, now, row[0]),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job = dict(zip(_COLUMNS, row))
+        job["attempts"] += 1
+        return job
+
+    def finish(self, job_id: str, result: dict):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE face_compare_jobs SET status = 'done', result = ?, error = NULL, owner = NULL, updated_at = ? "
+                "WHERE id = ?",
+                (json.dumps(result, default=str), time.time(), job_id),
+            )
+
+    def fail(self, job_id: str, error: str, retry_in: float = None):
+        """Requeue the job after retry_in seconds, or mark it failed for good when retry_in is None."""
+        now = time.time()
+        with self._lock:
+            if retry_in is None:
+                self._conn.execute(
+                    "UPDATE face_compare_jobs SET status = 'failed', error = ?, owner = NULL, updated_at = ? WHERE id = ?",
+                    (error, now, job_id),
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE face_compare_jobs SET status = 'queued', error = ?, owner = NULL, available_at = ?, "
+                    "updated_at = ? WHERE id = ?",
+                    (error, now + retry_in, now, job_id),
+                )
+
+    def requeue_orphans(self, is_alive, max_attempts: int):
+        """Put 'running' jobs back in the queue when the process that claimed them is gone.
+
+        Jobs that already used max_attempts are marked failed, so one that crashes its process isn't retried forever.
+        Returns (requeued, failed).
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, owner, attempts FROM face_compare_jobs WHERE status = 'running'"
+            ).fetchall()
+            orphans = [(job_id, attempts) for job_id, owner, attempts in rows if not is_alive(owner)]
+            requeued = [(now, now, job_id) for job_id, attempts in orphans if attempts < max_attempts]
+            failed = [(now, job_id) for job_id, attempts in orphans if attempts >= max_attempts]
+            self._conn.executemany(
+                "UPDATE face_compare_jobs SET status = 'queued', owner = NULL, available_at = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'running'",
+                requeued,
+            )
+            self._conn.executemany(
+                "UPDATE face_compare_jobs SET status = 'failed', error = 'worker process exited while running the job', "
+                "owner = NULL, updated_at = ? WHERE id = ? AND status = 'running'",
+                failed,
+            )
+        return len(requeued), len(failed)
+
+    def purge(self, older_than: float):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM face_compare_jobs WHERE status IN ('done', 'failed') AND updated_at < ?",
+                (time.time() - older_than,),
+            )
+
+    def get(self, job_id: str):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM face_compare_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(_COLUMNS, row))
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM face_compare_jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _owner(pid: int = None) -> str:
+    # Process start time guards against a new process reusing the pid of a dead one
+    process = psutil.Process(pid or os.getpid())
+    return f"{_HOST}:{process.pid}:{process.create_time():.0f}"
+
+
+def _owner_alive(owner: str) -> bool:
+    host, _, rest = (owner or "").partition(":")
+    pid = rest.split(":", 1)[0]
+    if host != _HOST or not pid.isdigit():
+        return False  # Jobs are only claimed on this host, so anything else is stale
+    try:
+        return _owner(int(pid)) == owner
+    except psutil.Error:
+        return False
+
+
+_store = None
+_workers = []
+_requeues = set()  # Requeues of jobs cut short by shutdown, awaited before the store closes
+_wakeup = None
+_stopping = False
+_stats = {"completed": 0, "retried": 0, "failed": 0}
+
+
+async def _run_job(job: dict):
+    # Imported here: face_compare pulls in the routers' dependencies, which this module is imported by
+    from utilities.face_compare import face_compare_auto
+
+    with span("face_compare_job", job_id=job["id"], attempt=job["attempts"]):
+        return await face_compare_auto(
+            document_front=job["document_front"],
+            liveness_document=job["liveness_document"],
+            session_id=job["session_id"],
+            csid=job["csid"],
+            msisdn=job["msisdn"],
+        )
+
+
+async def _record(fn, *args):
+    """Write a job outcome to the store, backing off and retrying on errors so the job isn't left 'running'.
+
+    Gives up once shutdown starts; the job is then requeued as an orphan by the next process.
+    """
+    while True:
+        try:
+            await asyncio.to_thread(fn, *args)
+            return
+        except sqlite3.Error as e:
+            logger.error(f"Face compare job store {fn.__name__} failed: {e}")
+            if _stopping:
+                return
+            await asyncio.sleep(FACE_COMPARE_JOB_STORE_BACKOFF)
+
+
+async def _worker():
+    owner = _owner()
+    while not _stopping:
+        try:
+            job = await asyncio.to_thread(_store.claim, owner)
+        except sqlite3.Error as e:
+            logger.error(f"Face compare job claim failed: {e}")
+            await asyncio.sleep(FACE_COMPARE_JOB_STORE_BACKOFF)
+            continue
+        if job is None:
+            try:
+                await asyncio.wait_for(_wakeup.wait(), FACE_COMPARE_JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            _wakeup.clear()
+            continue
+
+        try:
+            result = await _run_job(job)
+        except asyncio.CancelledError:
+            # Shielded so the requeue still lands while this task is being cancelled
+            requeue = asyncio.ensure_future(_record(_store.fail, job["id"], "interrupted by shutdown", 0))
+            _requeues.add(requeue)
+            await asyncio.shield(requeue)
+            raise
+        except Exception as e:
+            error = getattr(e, "detail", None) or str(e)
+            if job["attempts"] >= FACE_COMPARE_JOB_MAX_ATTEMPTS:
+                _stats["failed"] += 1
+                logger.error(f"Face compare job {job['id']} failed after {job['attempts']} attempts: {error}")
+                await _record(_store.fail, job["id"], error)
+            else:
+                _stats["retried"] += 1
+                retry_in = FACE_COMPARE_JOB_RETRY_DELAY * (2 ** (job["attempts"] - 1))
+                logger.warning(f"Face compare job {job['id']} attempt {job['attempts']} failed, retrying in {retry_in}s: {error}")
+                await _record(_store.fail, job["id"], error, retry_in)
+            continue
+
+        _stats["completed"] += 1
+        await _record(_store.finish, job["id"], result)
+        logger.info(f"Face compare job {job['id']} completed for msisdn: {job['msisdn']}")
+
+
+async def start():
+    """Open the job store, requeue jobs orphaned by a previous process and start the workers."""
+    global _store, _wakeup, _stopping
+    if FACE_COMPARE_MODE != "background":
+        return
+    _store = await asyncio.to_thread(JobStore, FACE_COMPARE_JOBS_PATH)
+    requeued, failed = await asyncio.to_thread(_store.requeue_orphans, _owner_alive, FACE_COMPARE_JOB_MAX_ATTEMPTS)
+    if requeued:
+        logger.info(f"Requeued {requeued} interrupted face compare jobs")
+    if failed:
+        logger.error(f"Failed {failed} interrupted face compare jobs that reached {FACE_COMPARE_JOB_MAX_ATTEMPTS} attempts")
+    await asyncio.to_thread(_store.purge, FACE_COMPARE_JOB_RETENTION)
+    _stopping = False
+    _wakeup = asyncio.Event()
+    _workers.extend(asyncio.create_task(_worker()) for _ in range(FACE_COMPARE_JOB_WORKERS))
+
+
+async def stop():
+    """Stop claiming jobs and give running ones a grace period; jobs cut short go back in the queue."""
+    global _store, _stopping
+    if not _workers:
+        return
+    _stopping = True
+    _wakeup.set()
+    _, pending = await asyncio.wait(_workers, timeout=FACE_COMPARE_JOB_SHUTDOWN_GRACE)
+    for task in pending:
+        task.cancel()
+    for result in await asyncio.gather(*_workers, return_exceptions=True):
+        if isinstance(result, Exception):
+            logger.error(f"Face compare job worker crashed: {result!r}")
+    await asyncio.gather(*_requeues)
+    _requeues.clear()
+    _workers.clear()
+    _store.close()
+    _store = None
+
+
+async def submit(document_front: str, liveness_document: str, session_id: str, csid: str, msisdn: int):
+    """Queue a face comparison and return its job id, or run it inline when FACE_COMPARE_MODE=inline.
+
+    Returns (job_id, result); job_id is None for inline runs and result is None for queued ones.
+    """
+    if FACE_COMPARE_MODE != "background":
+        from utilities.face_compare import face_compare_auto
+        result = await face_compare_auto(
+            document_front=document_front,
+            liveness_document=liveness_document,
+            session_id=session_id,
+            csid=csid,
+            msisdn=msisdn,
+        )
+        return None, result
+
+    if _store is None:
+        # The store opens with the lifespan and closes on shutdown
+        raise HTTPException(status_code=503, detail="Face compare queue is not available, retry later.")
+    job_id = uuid.uuid4().hex
+    await asyncio.to_thread(_store.enqueue, job_id, msisdn, session_id, csid, document_front, liveness_document)
+    _wakeup.set()
+    logger.info(f"Face compare job {job_id} queued for msisdn: {msisdn}")
+    return job_id, None
+
+
+async def get_job(job_id: str):
+    if _store is None:
+        return None
+    return await asyncio.to_thread(_store.get, job_id)
+
+
+async def get_stats():
+    """Queue depth by status from the shared store, plus this process's outcomes."""
+    if _store is None:
+        return {"mode": FACE_COMPARE_MODE}
+    counts = await asyncio.to_thread(_store.counts)  # May wait on another process's write lock
+    return {"mode": FACE_COMPARE_MODE, "workers": len(_workers), "jobs": counts, **_stats}
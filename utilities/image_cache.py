@@ -0,0 +1,143 @@
+import os
+import time
+import socket
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+from utilities import storage
+
+load_dotenv()
+
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", 256 * 1024 * 1024))  # Per worker; 0 disables the cache
+IMAGE_CACHE_TTL = float(os.getenv("IMAGE_CACHE_TTL", 900))                          # Seconds an image is kept after its last use
+SERVED_BY_HEADER_ENABLED = os.getenv("SERVED_BY_HEADER_ENABLED", "false").lower() == "true"  # Names host:pid on responses
+
+# The cache is per process, so later KYC stages only hit it when the load balancer keeps a session on the
+# same instance, e.g. nginx "hash $http_x_session_id consistent" with clients sending X-Session-Id.
+# SERVED_BY_HEADER_ENABLED adds X-Served-By to check the affinity; it exposes internal host names, so leave
+# it off where responses reach the public.
+SERVED_BY_HEADER = b"x-served-by"
+_HOST = socket.gethostname()
+
+
+class _Entry:
+    __slots__ = ("data", "size", "expires_at")
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.size = len(data)
+        self.expires_at = time.monotonic() + IMAGE_CACHE_TTL
+
+
+class ImageCache:
+    """LRU of recently handled encoded images keyed by MinIO object path, bounded by total bytes held."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self._stats["evictions"] += 1
+
+    def _lookup(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            del self._entries[key]
+            self._bytes -= entry.size
+            return None
+        entry.expires_at = time.monotonic() + IMAGE_CACHE_TTL
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            entry = _Entry(data)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            self._evict()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._lookup(key)
+            self._stats["hits" if entry is not None else "misses"] += 1
+            return entry.data if entry is not None else None
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_ratio": self._stats["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_cache = ImageCache(IMAGE_CACHE_MAX_BYTES)
+
+
+def _key(object_name: str) -> str:
+    # Paths come back from SP_FETCH_PHOTO_URL normalized, so store them the same way
+    return os.path.normpath(object_name)
+
+
+def put(object_name: str, data: bytes):
+    """Keep an image this worker just stored in MinIO, so later stages of the session can skip the download."""
+    if IMAGE_CACHE_MAX_BYTES > 0 and data:
+        _cache.put(_key(object_name), bytes(data))
+
+
+def get(object_name: str):
+    """Encoded bytes of a recently stored image, or None when this worker doesn't hold it."""
+    if IMAGE_CACHE_MAX_BYTES <= 0:
+        return None
+    return _cache.get(_key(object_name))
+
+
+async def fetch(object_name: str) -> bytes:
+    """Bytes of an object from this worker's cache when it holds them, otherwise downloaded from MinIO."""
+    cached = get(object_name)
+    if cached is not None:
+        return cached
+    return await storage.get_object(object_name)
+
+
+def get_image_cache_stats():
+    return _cache.stats()
+
+
+class ServedByMiddleware:
+    """ASGI middleware naming the instance and process on every response, to check session affinity."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (SERVED_BY_HEADER, _served_by())]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def _served_by() -> bytes:
+    # Computed per call: forked workers inherit this module from the parent, which has a different pid
+    return f"{_HOST}:{os.getpid()}".encode()
@@ -1,10 +1,18 @@
 from PIL import Image
 from io import BytesIO
-import os
+from contextlib import nullcontext
 
-def image_cropper(image_path: str, bounding_box: dict) -> BytesIO:
+def _open(image):
+    # Accept an already decoded image, encoded bytes held in memory, or a file path
+    if isinstance(image, Image.Image):
+        return nullcontext(image)
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return Image.open(BytesIO(image))
+    return Image.open(image)
+
+def image_cropper(image, bounding_box: dict) -> BytesIO:
     try:
-        with Image.open(image_path) as img:
+        with _open(image) as img:
             img_width, img_height = img.size
 
             left = int(bounding_box['Left'] * img_width)
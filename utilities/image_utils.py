@@ -0,0 +1,61 @@
+import os
+import math
+import numpy as np
+from io import BytesIO
+from dotenv import load_dotenv
+from PIL import Image, ImageOps
+
+load_dotenv()
+
+DETECTION_MAX_EDGE = int(os.getenv("DETECTION_MAX_EDGE", 1280))  # Longest edge fed to YOLO; 0 keeps full size
+FACE_MAX_EDGE = int(os.getenv("FACE_MAX_EDGE", 1920))            # Longest edge sent to the face backend; 0 keeps full size
+FACE_JPEG_QUALITY = int(os.getenv("FACE_JPEG_QUALITY", 90))      # Re-encode quality for downscaled face images
+
+
+def _open_reduced(file_content: bytes, max_edge: int):
+    """Open an image, letting libjpeg decode at 1/2, 1/4 or 1/8 scale when that still covers max_edge."""
+    img = Image.open(BytesIO(file_content))
+    original_edge = max(img.size)
+    if max_edge and original_edge > max_edge and img.format == "JPEG":
+        # draft() keeps a scale only if both edges stay at or above the request, so ask for the aspect-correct size
+        scale = max_edge / original_edge
+        img.draft("RGB", (math.ceil(img.width * scale), math.ceil(img.height * scale)))
+    return img, original_edge
+
+
+def _fit(img, max_edge: int):
+    if max_edge and max(img.size) > max_edge:
+        img.thumbnail((max_edge, max_edge), Image.Resampling.BILINEAR)
+    return img
+
+
+def decode_image(file_content: bytes, max_edge: int = DETECTION_MAX_EDGE):
+    """Decode uploaded image bytes into an upright HWC RGB array for YOLOv5.
+
+    Returns (array, scale) where scale maps array pixel coordinates back to the original image.
+    """
+    img, original_edge = _open_reduced(file_content, max_edge)
+    with img:
+        img = ImageOps.exif_transpose(img)  # Same orientation fix YOLOv5 applies to file inputs
+        img = _fit(img.convert("RGB"), max_edge)
+        return np.asarray(img), original_edge / max(img.size)
+
+
+def normalize_image(file_content: bytes, max_edge: int = FACE_MAX_EDGE, quality: int = FACE_JPEG_QUALITY) -> bytes:
+    """Downscale an oversized image and re-encode it as JPEG; small images are returned untouched.
+
+    Pixel orientation and the EXIF block are kept as uploaded, so relative bounding boxes
+    returned for the smaller image still line up with the original stored in MinIO.
+    """
+    if not max_edge:
+        return file_content
+
+    img, original_edge = _open_reduced(file_content, max_edge)
+    with img:
+        if original_edge <= max_edge:
+            return file_content
+        exif = img.info.get("exif")
+        img = _fit(img.convert("RGB"), max_edge)
+        stream = BytesIO()
+        img.save(stream, format="JPEG", quality=quality, **({"exif": exif} if exif else {}))
+        return stream.getvalue()
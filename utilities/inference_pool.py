@@ -0,0 +1,33 @@
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+load_dotenv()
+
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", 1))          # Threads running forward passes
+INFERENCE_MAX_PENDING = int(os.getenv("INFERENCE_MAX_PENDING", 64))  # Requests allowed to wait for a worker
+INFERENCE_TIMEOUT = float(os.getenv("INFERENCE_TIMEOUT", 30))       # Seconds a caller waits for its result
+
+_executor = None
+
+
+def get_executor():
+    """Dedicated thread pool so blocking model calls never run on the event loop."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=INFERENCE_WORKERS, thread_name_prefix="inference")
+    return _executor
+
+
+async def run_in_pool(fn, *args):
+    """Run a blocking callable on the inference pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), fn, *args)
+
+
+def shutdown_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
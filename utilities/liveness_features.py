@@ -0,0 +1,105 @@
+import os
+import asyncio
+from io import BytesIO
+from dotenv import load_dotenv
+from utilities import storage, image_cache
+from utilities.logger import logger
+from utilities.face_backends import LocalFaceBackend, get_face_backend
+
+load_dotenv()
+
+# Extract the liveness face crop and embedding at upload time so face compare only analyses the document.
+# Only the local backend consumes them: Rekognition would need the full photo for its bounding boxes.
+LIVENESS_PRECOMPUTE_FACE = os.getenv("LIVENESS_PRECOMPUTE_FACE", "false").lower() == "true"
+LIVENESS_FACE_MARGIN = float(os.getenv("LIVENESS_FACE_MARGIN", 0.25))  # Crop padding as a fraction of face size
+
+
+def precompute_enabled() -> bool:
+    """Whether liveness features are precomputed and used; requires FACE_COMPARE_BACKEND=local."""
+    return LIVENESS_PRECOMPUTE_FACE and isinstance(get_face_backend(), LocalFaceBackend)
+
+
+def face_crop_path(liveness_photo_path: str) -> str:
+    """MinIO path of the face crop stored next to the liveness photo."""
+    return f"{os.path.splitext(liveness_photo_path)[0]}_face.jpg"
+
+
+def embedding_path(liveness_photo_path: str) -> str:
+    """MinIO path of the face embedding stored next to the liveness photo."""
+    return f"{os.path.splitext(liveness_photo_path)[0]}_embedding.npz"
+
+
+def _extract(image_bytes: bytes):
+    import numpy as np
+    from PIL import Image, ImageOps
+
+    backend = get_face_backend()
+    size, faces = backend.analyse(image_bytes)
+    if not faces:
+        return None
+
+    face, embedding = max(faces, key=lambda f: f[0][2] * f[0][3])
+    x, y, w, h = (float(v) for v in face[:4])
+    pad_x, pad_y = w * LIVENESS_FACE_MARGIN, h * LIVENESS_FACE_MARGIN
+
+    with Image.open(BytesIO(image_bytes)) as img:
+        img = ImageOps.exif_transpose(img)  # OpenCV decodes with EXIF orientation applied
+        crop = img.convert("RGB").crop((
+            max(0, int(x - pad_x)),
+            max(0, int(y - pad_y)),
+            min(size[0], int(x + w + pad_x)),
+            min(size[1], int(y + h + pad_y)),
+        ))
+        crop_stream = BytesIO()
+        crop.save(crop_stream, format="JPEG", quality=95)
+
+    features_stream = BytesIO()
+    np.savez(features_stream, face=face, embedding=embedding, size=np.array(size))
+    return crop_stream.getvalue(), features_stream.getvalue()
+
+
+async def precompute_liveness_features(liveness_photo_path: str, image_bytes: bytes):
+    """Store the liveness face crop and embedding alongside the liveness photo in MinIO."""
+    try:
+        extracted = await get_face_backend().run(_extract, image_bytes)
+        if extracted is None:
+            logger.warning(f"No face found in liveness photo: {liveness_photo_path}")
+            return
+
+        crop_bytes, features_bytes = extracted
+        await asyncio.gather(
+            storage.put_object(face_crop_path(liveness_photo_path), crop_bytes),
+            storage.put_object(
+                embedding_path(liveness_photo_path), features_bytes, content_type="application/octet-stream"
+            ),
+        )
+        image_cache.put(face_crop_path(liveness_photo_path), crop_bytes)
+        image_cache.put(embedding_path(liveness_photo_path), features_bytes)
+        logger.info(f"Liveness face features stored for: {liveness_photo_path}")
+    except Exception as e:
+        # Face compare falls back to analysing the full liveness photo
+        logger.error(f"Failed to precompute liveness face features: {e}")
+
+
+async def load_liveness_features(liveness_photo_path: str):
+    """Fetch precomputed liveness features, or None if they were never stored."""
+    if not precompute_enabled():
+        return None
+
+    import numpy as np
+
+    try:
+        crop_bytes, features_bytes = await asyncio.gather(
+            image_cache.fetch(face_crop_path(liveness_photo_path)),
+            image_cache.fetch(embedding_path(liveness_photo_path)),
+        )
+    except Exception:
+        return None
+
+    with np.load(BytesIO(features_bytes)) as features:
+        return {
+            "face_image": crop_bytes,
+            "face": features["face"],
+            "embedding": features["embedding"],
+            "size": features["size"].tolist(),
+        }
@@ -1,36 +1,120 @@
+import os
+import queue
 import logging
 import asyncio
 import aiomysql
+from dotenv import load_dotenv
 from database import dbconfig
 
+load_dotenv()
+
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))            # Records buffered before overflow
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", 200))              # Rows per INSERT
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", 1.0))    # Seconds between flushes
+LOG_OVERFLOW_POLICY = os.getenv("LOG_OVERFLOW_POLICY", "drop_oldest")  # "drop_oldest" or "drop_newest"
+
+
 class MySQLHandler(logging.Handler):
-    def __init__(self, db_config):
+    """Buffers log records in memory and bulk-inserts them into the logs table from a background task."""
+
+    def __init__(self, db_config, max_queue_size=LOG_QUEUE_SIZE, batch_size=LOG_BATCH_SIZE,
+                 flush_interval=LOG_FLUSH_INTERVAL, overflow_policy=LOG_OVERFLOW_POLICY):
         super().__init__()
         self.db_config = db_config
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._loop = None
+        self._wakeup = None
+        self._task = None
+        self._stopping = False
+        self.stats = {"written": 0, "dropped": 0, "failed": 0}
 
     def emit(self, record):
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            loop.create_task(self._async_emit(record))
-        else:
-            loop.run_until_complete(self._async_emit(record))
-
-    async def _async_emit(self, record):
-        log_entry = self.format(record)
+        try:
+            entry = (record.levelname, self.format(record))
+        except Exception:
+            self.handleError(record)
+            return
+
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.stats["dropped"] += 1
+            if self.overflow_policy != "drop_oldest":
+                return
+            try:
+                self._queue.get_nowait()
+                self._queue.put_nowait(entry)
+            except (queue.Empty, queue.Full):
+                pass
+
+        # Records may come from worker threads, so wake the flusher through its loop
+        if self._loop is not None and self._queue.qsize() >= self.batch_size:
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                pass  # Loop already closed during shutdown
+
+    async def start(self):
+        """Start the background flusher; call once the db pool exists."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and write out everything still buffered."""
+        if self._task is not None:
+            # Not cancelled: a flush interrupted mid-INSERT would lose the rows it already dequeued
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        while not self._queue.empty():
+            await self._flush()
+        self._loop = None
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while not self._queue.empty():
+                await self._flush()
+
+    async def _flush(self):
+        rows = []
+        while len(rows) < self.batch_size:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if not rows:
+            return
+
         try:
             async with dbconfig.db_pool.acquire() as conn:
                 async with conn.cursor() as cursor:
-                    await cursor.execute(
+                    await cursor.executemany(
                         "INSERT INTO logs (level, message) VALUES (%s, %s)",
-                        (record.levelname, log_entry)
+                        rows
                     )
                     await conn.commit()
+            self.stats["written"] += len(rows)
         except Exception as e:
+            self.stats["failed"] += len(rows)
             print(f"Failed to log to database: {e}")
 
+    def get_stats(self):
+        return {**self.stats, "queued": self._queue.qsize()}
+
 # Logger setup
 logger = logging.getLogger("db_logger")
 logger.setLevel(logging.INFO)
 logger_handler = MySQLHandler(dbconfig.db_config)
 logger_handler.setFormatter(logging.Formatter("%(message)s"))
-logger.addHandler(logger_handler)
\ No newline at end of file
+logger.addHandler(logger_handler)
@@ -0,0 +1,160 @@
+import time
+import bisect
+import threading
+import contextvars
+from contextlib import contextmanager
+from utilities.tracing import span
+
+# Latency buckets in seconds, from sub-millisecond cache hits up to slow remote calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram; cheap enough to observe on every request."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "avg": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+_current_scope = contextvars.ContextVar("metrics_scope", default=None)
+_route_paths = {}
+stage_latency = {}
+
+
+def endpoint_label(scope) -> str:
+    """Route template for the request, so path parameters don't explode label cardinality."""
+    if scope is None:
+        return "background"
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    if endpoint not in _route_paths:
+        for route in scope["app"].routes:
+            if getattr(route, "endpoint", None) is endpoint:
+                _route_paths[endpoint] = route.path
+                break
+        else:
+            _route_paths[endpoint] = endpoint.__name__
+    return _route_paths[endpoint]
+
+
+def observe_stage(endpoint: str, stage_name: str, seconds: float):
+    key = (endpoint, stage_name)
+    histogram = stage_latency.get(key)
+    if histogram is None:
+        histogram = stage_latency.setdefault(key, Histogram())
+    histogram.observe(seconds)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a block as a stage of the current request's endpoint, and as a tracing span."""
+    start = time.perf_counter()
+    try:
+        with span(name):
+            yield
+    finally:
+        observe_stage(endpoint_label(_current_scope.get()), name, time.perf_counter() - start)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording end-to-end latency per endpoint and exposing the request to stage()."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        token = _current_scope.set(scope)
+        start = time.perf_counter()
+        recorded = False
+
+        async def send_wrapper(message):
+            nonlocal recorded
+            await send(message)
+            # Stop the clock once the body is sent, before any background tasks run
+            if message["type"] == "http.response.body" and not message.get("more_body") and not recorded:
+                recorded = True
+                observe_stage(endpoint_label(scope), "total", time.perf_counter() - start)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not recorded:
+                observe_stage(endpoint_label(scope), "total", time.perf_counter() - start)
+            _current_scope.reset(token)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def format_histogram(name: str, help_text: str, series):
+    """Render (labels, Histogram) pairs as one Prometheus histogram metric."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for labels, histogram in series:
+        cumulative = 0
+        for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+            cumulative += bucket_count
+            lines.append(f"{name}_bucket{_labels({**labels, 'le': bound})} {cumulative}")
+        lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {histogram.count}")
+        lines.append(f"{name}_sum{_labels(labels)} {histogram.sum}")
+        lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+    return lines
+
+
+def format_metric(name: str, metric_type: str, help_text: str, series):
+    """Render (labels, value) pairs as one Prometheus gauge or counter."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    for labels, value in series:
+        lines.append(f"{name}{_labels(labels)} {value}")
+    return lines
+
+
+def render_stage_metrics():
+    return format_histogram(
+        "kyc_stage_duration_seconds",
+        "Latency of each pipeline stage per endpoint.",
+        [({"endpoint": endpoint, "stage": name}, histogram) for (endpoint, name), histogram in stage_latency.items()],
+    )
@@ -0,0 +1,147 @@
+import os
+import time
+import threading
+import numpy as np
+import psutil
+from dotenv import load_dotenv
+from utilities.logger import logger
+# Path to the cloned YOLOv5 repository
+#If you have linux (or deploying for linux) use:
+from pathlib import Path
+import pathlib
+pathlib.WindowsPath = pathlib.PosixPath
+
+load_dotenv()
+
+# Paths to the YOLOv5 repository and model files
+YOLO_REPO_DIR = Path(os.getenv("YOLO_REPO_DIR", "yolov5")).resolve()  # YOLOv5 repository path
+MODEL_PATHS = {
+    "document": Path(os.getenv("DOCUMENT_MODEL_PATH", "yolo/best.pt")).resolve(),
+}
+
+# "torch" runs the checkpoint through the YOLOv5 repo; "onnx" / "torchscript" load the graph
+# written next to it by scripts/export_detector.py and need no YOLOv5 checkout at runtime;
+# "onnx-int8" loads the quantized graph from scripts/quantize_detector.py
+DETECTOR_BACKEND = os.getenv("DETECTOR_BACKEND", "torch")
+
+MODEL_LOAD_MODE = os.getenv("MODEL_LOAD_MODE", "lazy")          # "lazy" or "eager"
+MODEL_WARMUP_RUNS = int(os.getenv("MODEL_WARMUP_RUNS", 1))      # Dummy forward passes after load
+MODEL_WARMUP_SIZE = int(os.getenv("MODEL_WARMUP_SIZE", 640))    # Square warm-up image edge in pixels
+TORCH_THREADS = int(os.getenv("TORCH_THREADS", 0))              # Intra-op threads for torch; 0 keeps torch's default
+
+_models = {}
+_model_stats = {}
+_needs_warmup = set()
+_lock = threading.Lock()
+
+
+def _rss_mb():
+    return psutil.Process(os.getpid()).memory_info().rss / (1024 * 1024)
+
+
+def _build(name: str):
+    model_path = MODEL_PATHS[name]
+    if DETECTOR_BACKEND == "torch":
+        import torch  # Deferred: importing torch dominates cold start and isn't needed by the exported backends
+        if TORCH_THREADS:
+            torch.set_num_threads(TORCH_THREADS)
+
+        # Load the YOLOv5 model using the local repository
+        model = torch.hub.load(
+            str(YOLO_REPO_DIR),  # Path to the YOLOv5 repository
+            'custom',            # Custom model
+            path=str(model_path),  # Path to the trained weights
+            source='local',       # Use local repository
+            force_reload=False    # Avoid unnecessary reloads
+        )
+        return model, model_path
+
+    from utilities.detector_backends import DETECTOR_BACKENDS
+    if DETECTOR_BACKEND not in DETECTOR_BACKENDS:
+        raise ValueError(f"Unknown DETECTOR_BACKEND: {DETECTOR_BACKEND}")
+    detector_class, suffix = DETECTOR_BACKENDS[DETECTOR_BACKEND]
+    if DETECTOR_BACKEND == "torchscript":
+        import torch
+        if TORCH_THREADS:
+            torch.set_num_threads(TORCH_THREADS)  # freeze/optimize_for_inference run on torch's pool too
+    export_path = model_path.with_suffix(suffix)
+    return detector_class(export_path), export_path
+
+
+def _warm_up(name: str, model):
+    warmup_start = time.perf_counter()
+    dummy = np.zeros((MODEL_WARMUP_SIZE, MODEL_WARMUP_SIZE, 3), dtype=np.uint8)
+    for _ in range(MODEL_WARMUP_RUNS):
+        model(dummy)
+    _model_stats[name]["warmup_runs"] = MODEL_WARMUP_RUNS
+    _model_stats[name]["warmup_seconds"] = round(time.perf_counter() - warmup_start, 3)
+
+
+def _load(name: str, warmup: bool = True):
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    model, model_path = _build(name)
+    load_seconds = time.perf_counter() - start
+
+    _model_stats[name] = {
+        "path": str(model_path),
+        "backend": DETECTOR_BACKEND,
+        "load_seconds": round(load_seconds, 3),
+        "warmup_runs": 0,
+        "warmup_seconds": 0.0,
+    }
+    if warmup:
+        _warm_up(name, model)
+    _model_stats[name]["rss_delta_mb"] = round(_rss_mb() - rss_before, 1)
+    logger.info(f"Model '{name}' loaded: {_model_stats[name]}")
+    return model
+
+
+def get_model(name: str = "document"):
+    """Return the shared model instance, loading it on first use."""
+    model = _models.get(name)
+    if model is not None:
+        return model
+
+    with _lock:
+        if name not in _models:
+            _models[name] = _load(name)
+        return _models[name]
+
+
+def is_loaded(name: str = "document") -> bool:
+    return name in _models
+
+
+def load_models():
+    """Warm models preloaded before fork, and eagerly load the rest when MODEL_LOAD_MODE is 'eager'."""
+    for name in MODEL_PATHS:
+        if MODEL_LOAD_MODE != "eager" and not is_loaded(name):
+            continue
+        model = get_model(name)
+        with _lock:
+            pending = name in _needs_warmup
+            _needs_warmup.discard(name)
+        if pending:
+            _warm_up(name, model)
+
+
+def preload_models():
+    """Load every model without warming it up, for a parent process about to fork workers.
+
+    A forward pass would start torch's OpenMP thread pool, which does not survive fork;
+    each worker warms the shared weights itself through load_models().
+    """
+    with _lock:
+        for name in MODEL_PATHS:
+            if name not in _models:
+                _models[name] = _load(name, warmup=False)
+                _needs_warmup.add(name)
+
+
+def get_model_stats():
+    """Load time, warm-up time and resident memory for each loaded model."""
+    return {
+        "models": dict(_model_stats),
+        "process_rss_mb": round(_rss_mb(), 1),
+    }
@@ -0,0 +1,107 @@
+import gc
+import os
+import sys
+import time
+import signal
+import traceback
+import uvicorn
+from dotenv import load_dotenv
+from utilities import model_registry, detector_backends
+
+load_dotenv()
+
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", 1))                  # Forked server processes; 1 runs a single uvicorn
+WORKER_RESTART_DELAY = float(os.getenv("WORKER_RESTART_DELAY", 1))  # Seconds before replacing a crashed worker
+
+# Exported ONNX Runtime sessions own thread pools that don't survive fork, so only torch weights are preloaded
+FORK_SHARED_BACKENDS = {"torch", "torchscript"}
+
+
+def _threads_per_worker(workers: int) -> int:
+    # TORCH_THREADS applies per worker; by default the node's cores are split evenly
+    return model_registry.TORCH_THREADS or max(1, (os.cpu_count() or 1) // workers)
+
+
+def _run_worker(app, sock, threads: int):
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    # Keep each worker on its share of the cores instead of every worker using all of them
+    model_registry.TORCH_THREADS = threads
+    if not detector_backends.DETECTOR_THREADS:
+        detector_backends.DETECTOR_THREADS = threads
+    if "torch" in sys.modules:
+        torchscript = model_registry.DETECTOR_BACKEND == "torchscript"
+        sys.modules["torch"].set_num_threads(detector_backends.DETECTOR_THREADS if torchscript else threads)
+
+    server = uvicorn.Server(uvicorn.Config(app, log_level="info"))
+    server.run(sockets=[sock])
+
+
+def serve_forked(app, host: str, port: int, workers: int = WEB_WORKERS):
+    """Bind once, load the detector once, then fork workers that share its weights copy-on-write."""
+    threads = _threads_per_worker(workers)
+    sock = uvicorn.Config(app, host=host, port=port).bind_socket()
+
+    if model_registry.DETECTOR_BACKEND in FORK_SHARED_BACKENDS:
+        # Loading must not start an OpenMP pool in the parent; workers get their own thread counts after fork
+        detector_threads = detector_backends.DETECTOR_THREADS
+        model_registry.TORCH_THREADS = 1
+        detector_backends.DETECTOR_THREADS = 1
+        model_registry.preload_models()
+        detector_backends.DETECTOR_THREADS = detector_threads
+    # Move everything allocated so far out of the collector's reach, so gc passes in the
+    # workers don't write to (and un-share) the parent's pages
+    gc.collect()
+    gc.freeze()
+
+    children = {}
+    stopping = False
+
+    def spawn(index: int):
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                _run_worker(app, sock, threads)
+            except BaseException:
+                traceback.print_exc()
+                exit_code = 1
+            finally:
+                os._exit(exit_code)  # Never fall back into the parent's supervision loop
+        children[pid] = (index, time.monotonic())
+        print(f"Started worker {index} (pid {pid}, {threads} threads)", flush=True)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    print(f"Serving on {host}:{port} with {workers} workers", flush=True)
+    for index in range(workers):
+        spawn(index)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        if pid not in children:
+            continue
+        index, started = children.pop(pid)
+        if stopping:
+            continue
+        print(f"Worker {index} (pid {pid}) exited with status {os.waitstatus_to_exitcode(status)}; restarting", flush=True)
+        if time.monotonic() - started < WORKER_RESTART_DELAY:
+            time.sleep(WORKER_RESTART_DELAY)  # Don't spin if workers die right after starting
+        if not stopping:
+            spawn(index)
+
+    sock.close()
@@ -0,0 +1,64 @@
+import os
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from database import dbconfig
+from utilities.face_compare_cache import MemoryCacheBackend
+
+load_dotenv()
+
+SESSION_STATE_TTL = float(os.getenv("SESSION_STATE_TTL", 1800))                # Seconds a KYC session's paths are kept
+SESSION_STATE_MAX_ENTRIES = int(os.getenv("SESSION_STATE_MAX_ENTRIES", 10000))  # Sessions tracked per worker
+
+# Artefact kinds recorded per session
+LIVENESS = "liveness"
+DOCUMENT_FRONT = "document_front"
+
+_sessions = MemoryCacheBackend(SESSION_STATE_MAX_ENTRIES, SESSION_STATE_TTL)
+_stats = {"hits": 0, "misses": 0}
+
+
+def _key(msisdn: int, session_id: str) -> str:
+    return f"{msisdn}:{session_id}"
+
+
+def record_path(msisdn: int, session_id: str, kind: str, path: str):
+    """Remember where a stage stored its artefact once the database has accepted it."""
+    key = _key(msisdn, session_id)
+    paths = dict(_sessions.get(key) or {})
+    paths[kind] = path
+    _sessions.set(key, paths)  # Also restarts the session's TTL
+
+
+async def _fetch_from_db(msisdn: int):
+    async with dbconfig.db_pool.acquire() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.callproc('SP_FETCH_PHOTO_URL', (msisdn,))
+            paths_result = await cursor.fetchall()
+
+    if not paths_result or len(paths_result[0]) < 2:
+        raise HTTPException(status_code=500, detail="Failed to fetch required document paths.")
+    return paths_result[0]
+
+
+async def fetch_photo_paths(msisdn: int, session_id: str):
+    """Return (liveness_document_path, document_front_path), from this worker's session state when
+    both stages were handled here, otherwise from SP_FETCH_PHOTO_URL."""
+    paths = _sessions.get(_key(msisdn, session_id)) or {}
+    if LIVENESS in paths and DOCUMENT_FRONT in paths:
+        _stats["hits"] += 1
+        liveness_document_path, document_front_path = paths[LIVENESS], paths[DOCUMENT_FRONT]
+    else:
+        _stats["misses"] += 1
+        liveness_document_path, document_front_path = await _fetch_from_db(msisdn)
+
+    # Normalize MinIO paths
+    return os.path.normpath(liveness_document_path), os.path.normpath(document_front_path)
+
+
+def get_session_state_stats():
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "hit_ratio": _stats["hits"] / lookups if lookups else 0.0,
+        "sessions": len(_sessions),
+    }
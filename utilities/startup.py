@@ -0,0 +1,71 @@
+import os
+import time
+import asyncio
+import psutil
+from utilities.logger import logger
+
+_steps = {}
+_background = set()
+_state = {"lifespan_started": None, "lifespan_ready": None}
+
+
+def _since_process_start() -> float:
+    return time.time() - psutil.Process(os.getpid()).create_time()
+
+
+async def _run(name: str, fn):
+    """Run one startup step, recording its duration and outcome; sync callables run in a thread."""
+    _steps[name] = {"status": "running", "seconds": None}
+    start = time.perf_counter()
+    try:
+        if asyncio.iscoroutinefunction(fn):
+            await fn()
+        else:
+            await asyncio.to_thread(fn)
+        _steps[name]["status"] = "ok"
+    except Exception as e:
+        _steps[name]["status"] = f"failed: {e}"
+        raise
+    finally:
+        _steps[name]["seconds"] = round(time.perf_counter() - start, 3)
+        logger.info(f"Startup step '{name}' {_steps[name]['status']} in {_steps[name]['seconds']}s")
+
+
+async def run_parallel(**steps):
+    """Run independent startup steps concurrently."""
+    if _state["lifespan_started"] is None:
+        _state["lifespan_started"] = round(_since_process_start(), 3)  # Interpreter start + module imports
+    await asyncio.gather(*(_run(name, fn) for name, fn in steps.items()))
+
+
+def run_in_background(name: str, fn):
+    """Start a slow step (e.g. model warm-up) without holding up the server; /ready waits for it."""
+    task = asyncio.create_task(_run(name, fn))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())  # Failure is already in the report
+    return task
+
+
+def cancel_background():
+    for task in list(_background):
+        task.cancel()
+
+
+def mark_lifespan_ready():
+    _state["lifespan_ready"] = round(_since_process_start(), 3)
+
+
+def is_ready() -> bool:
+    """True once the lifespan has finished and every startup step, including background ones, succeeded."""
+    return _state["lifespan_ready"] is not None and all(step["status"] == "ok" for step in _steps.values())
+
+
+def get_startup_report():
+    """Seconds spent per startup step, and process age when the lifespan began and finished."""
+    return {
+        "ready": is_ready(),
+        "imports_seconds": _state["lifespan_started"],
+        "lifespan_ready_seconds": _state["lifespan_ready"],
+        "steps": {name: dict(step) for name, step in _steps.items()},
+    }
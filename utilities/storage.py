@@ -0,0 +1,115 @@
+import os
+import time
+import asyncio
+import threading
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from utilities.config import get_minio_client, MINIO_BUCKET, MINIO_POOL_MAXSIZE
+
+load_dotenv()
+
+MIN_PART_SIZE = 5 * 1024 * 1024  # S3 lower bound for multipart parts
+
+STORAGE_IO_THREADS = int(os.getenv("STORAGE_IO_THREADS", MINIO_POOL_MAXSIZE))  # Concurrent MinIO calls
+MINIO_MULTIPART_THRESHOLD = int(os.getenv("MINIO_MULTIPART_THRESHOLD", 16 * 1024 * 1024))  # Bytes
+MINIO_PART_SIZE = max(MIN_PART_SIZE, int(os.getenv("MINIO_PART_SIZE", 8 * 1024 * 1024)))  # Bytes
+MINIO_PARALLEL_UPLOADS = int(os.getenv("MINIO_PARALLEL_UPLOADS", 3))  # Parts uploaded at once
+
+_executor = ThreadPoolExecutor(max_workers=STORAGE_IO_THREADS, thread_name_prefix="storage")
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _record(op: str, seconds: float, nbytes: int, failed: bool):
+    with _stats_lock:
+        stat = _stats.setdefault(op, {"count": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0, "bytes": 0})
+        stat["count"] += 1
+        stat["errors"] += int(failed)
+        stat["total_seconds"] += seconds
+        stat["max_seconds"] = max(stat["max_seconds"], seconds)
+        stat["bytes"] += nbytes
+
+
+async def _run(op: str, fn, nbytes: int = 0):
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    failed = True
+    try:
+        result = await loop.run_in_executor(_executor, fn)
+        failed = False
+        return result
+    finally:
+        _record(op, time.perf_counter() - start, nbytes, failed)
+
+
+def _part_size(length: int) -> int:
+    # Below the threshold a single part covers the whole object, so MinIO does one plain PUT
+    if length < MINIO_MULTIPART_THRESHOLD:
+        return max(MIN_PART_SIZE, length)
+    return MINIO_PART_SIZE
+
+
+async def put_object(object_name: str, data: bytes, content_type: str = "image/jpeg"):
+    """Upload bytes to MinIO without blocking the event loop."""
+    length = len(data)
+    return await _run("put_object", lambda: get_minio_client().put_object(
+        bucket_name=MINIO_BUCKET,
+        object_name=object_name,
+        data=BytesIO(data),
+        length=length,
+        content_type=content_type,
+        part_size=_part_size(length),
+        num_parallel_uploads=MINIO_PARALLEL_UPLOADS,
+    ), length)
+
+
+async def fput_object(object_name: str, file_path: str, content_type: str = "image/jpeg"):
+    """Upload a local file to MinIO without blocking the event loop."""
+    length = os.path.getsize(file_path)
+    return await _run("fput_object", lambda: get_minio_client().fput_object(
+        bucket_name=MINIO_BUCKET,
+        object_name=object_name,
+        file_path=file_path,
+        content_type=content_type,
+        part_size=_part_size(length),
+        num_parallel_uploads=MINIO_PARALLEL_UPLOADS,
+    ), length)
+
+
+def _read_object(object_name: str) -> bytes:
+    response = get_minio_client().get_object(MINIO_BUCKET, object_name)
+    try:
+        return response.read()
+    finally:
+        response.close()
+        response.release_conn()
+
+
+async def get_object(object_name: str) -> bytes:
+    """Download an object from MinIO into memory without blocking the event loop."""
+    start = time.perf_counter()
+    try:
+        data = await asyncio.get_running_loop().run_in_executor(_executor, _read_object, object_name)
+    except Exception:
+        _record("get_object", time.perf_counter() - start, 0, True)
+        raise
+    _record("get_object", time.perf_counter() - start, len(data), False)
+    return data
+
+
+async def fget_object(object_name: str, file_path: str):
+    """Download an object from MinIO to a local path without blocking the event loop."""
+    return await _run("fget_object", lambda: get_minio_client().fget_object(MINIO_BUCKET, object_name, file_path))
+
+
+def get_storage_stats():
+    """Per-operation call counts, errors, bytes and latency for MinIO calls."""
+    with _stats_lock:
+        return {
+            op: {
+                **stat,
+                "avg_seconds": stat["total_seconds"] / stat["count"] if stat["count"] else 0.0,
+            }
+            for op, stat in _stats.items()
+        }
@@ -0,0 +1,98 @@
+import os
+import json
+import time
+import uuid
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+load_dotenv()
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "traces.jsonl")  # One JSON span per line
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+_export_lock = threading.Lock()
+_export_file = None
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes", "start", "start_time")
+
+    def __init__(self, name: str, parent, attributes: dict):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        # Children inherit session_id / msisdn so every span can be grouped by session
+        self.attributes = {**parent.attributes, **attributes} if parent else dict(attributes)
+        self.start = time.perf_counter()
+        self.start_time = time.time()
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+
+def _export(record: dict):
+    global _export_file
+    line = json.dumps(record, default=str) + "\n"
+    with _export_lock:
+        if _export_file is None:
+            _export_file = open(TRACE_EXPORT_PATH, "a", buffering=1)  # Line buffered
+        _export_file.write(line)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a block as a span nested under the current one; exported as a JSON line when it ends."""
+    if not TRACING_ENABLED:
+        yield None
+        return
+
+    current = Span(name, _current_span.get(), attributes)
+    token = _current_span.set(current)
+    status = "ok"
+    try:
+        yield current
+    except BaseException as e:
+        status = f"error: {type(e).__name__}"
+        raise
+    finally:
+        _current_span.reset(token)
+        _export({
+            "trace_id": current.trace_id,
+            "span_id": current.span_id,
+            "parent_id": current.parent_id,
+            "name": current.name,
+            "start_time": current.start_time,
+            "duration_ms": round((time.perf_counter() - current.start) * 1000, 3),
+            "status": status,
+            "attributes": current.attributes,
+        })
+
+
+def close_exporter():
+    global _export_file
+    with _export_lock:
+        if _export_file is not None:
+            _export_file.close()
+            _export_file = None
+
+
+def traced(name: str):
+    """Wrap an async handler in a root span tagged with its session_id / msisdn arguments."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            attributes = {}
+            session_id = kwargs.get("session_id", kwargs.get("sessionId"))
+            if session_id is not None:
+                attributes["session_id"] = session_id
+            if kwargs.get("msisdn") is not None:
+                attributes["msisdn"] = kwargs["msisdn"]
+            with span(name, **attributes):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorator